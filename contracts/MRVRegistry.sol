@@ -48,6 +48,30 @@ contract MRVRegistry {
      * - Hash must not be zero
      */
     function registerMRV(string memory mrvId, bytes32 hash) external {
+        _registerMRV(mrvId, hash);
+    }
+    
+    /**
+     * @dev Register several MRV records in one transaction
+     * @param mrvIds Unique MRV identifiers
+     * @param hashes SHA-256 hashes of the MRV JSON data, one per MRV ID
+     * 
+     * Requirements:
+     * - Both arrays must have the same length
+     * - Every record must satisfy the registerMRV requirements
+     */
+    function registerMRVBatch(string[] calldata mrvIds, bytes32[] calldata hashes) external {
+        require(mrvIds.length == hashes.length, "Length mismatch");
+        
+        for (uint256 i = 0; i < mrvIds.length; i++) {
+            _registerMRV(mrvIds[i], hashes[i]);
+        }
+    }
+    
+    /**
+     * @dev Store an MRV record and emit MRVRegistered
+     */
+    function _registerMRV(string memory mrvId, bytes32 hash) internal {
         require(!mrvRecords[mrvId].exists, "MRV ID already registered");
         require(hash != bytes32(0), "Hash cannot be zero");
         
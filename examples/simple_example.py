@@ -5,8 +5,12 @@ This minimal example shows how to use MRV tracker with any code.
 """
 
 from mrv_wrapper import MRVTracker
+import logging
 import time
 
+# Show MRV tracker progress messages
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 
 def my_training_function():
     """Simulate training workload."""
@@ -5,15 +5,18 @@ This example demonstrates how to integrate the MRV wrapper into
 a PyTorch training workflow.
 """
 
+import logging
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import torchvision
-import torchvision.transforms as transforms
+from torchvision.transforms import v2
 from torch.utils.data import DataLoader
 
 # Import MRV wrapper
 from mrv_wrapper import MRVTracker
+from mrv_wrapper.dataloader_tune import best_num_workers
 
 
 def create_model():
@@ -22,21 +25,123 @@ def create_model():
     return model
 
 
-def train_epoch(model, train_loader, criterion, optimizer, device):
+def select_amp_dtype(device):
+    """
+    Pick the autocast dtype for mixed precision on Volta (SM 7.0) or newer.
+    
+    bfloat16 needs native support (Ampere, SM 8.0+); it is checked by
+    capability because torch.cuda.is_bf16_supported() also reports
+    emulated bf16 on SM 7.x. Older GPUs get float16, which needs a
+    GradScaler.
+    
+    Args:
+        device: Training device
+        
+    Returns:
+        torch.bfloat16, torch.float16, or None to train in float32
+    """
+    if device.type != 'cuda':
+        return None
+    major = torch.cuda.get_device_capability(device)[0]
+    if major >= 8:
+        return torch.bfloat16
+    if major >= 7:
+        return torch.float16
+    return None
+
+
+CIFAR10_MEAN = (0.4914, 0.4822, 0.4465)
+CIFAR10_STD = (0.2023, 0.1994, 0.2010)
+
+
+class DeviceNormalize:
+    """
+    Convert uint8 image batches to normalized float32 on the target device.
+    
+    (x / 255 - mean) / std is folded into a single scale and shift, so the
+    conversion runs as two elementwise kernels on the device instead of
+    per-sample CPU work in the DataLoader workers.
+    """
+    
+    def __init__(self, mean, std, device):
+        mean = torch.tensor(mean, device=device).view(1, 3, 1, 1)
+        std = torch.tensor(std, device=device).view(1, 3, 1, 1)
+        self.scale = 1.0 / (255.0 * std)
+        self.shift = mean / std
+    
+    def __call__(self, inputs):
+        return inputs.float().mul_(self.scale).sub_(self.shift)
+
+
+class CUDAPrefetcher:
+    """
+    Wrap a DataLoader and copy the next batch to the GPU on a side stream
+    while the current batch is being processed.
+    """
+    
+    def __init__(self, loader, device):
+        self.loader = loader
+        self.device = device
+        self.stream = torch.cuda.Stream()
+    
+    def __len__(self):
+        return len(self.loader)
+    
+    def __iter__(self):
+        self._iter = iter(self.loader)
+        self._preload()
+        return self
+    
+    def __next__(self):
+        torch.cuda.current_stream().wait_stream(self.stream)
+        inputs, targets = self.next_inputs, self.next_targets
+        if inputs is None:
+            raise StopIteration
+        
+        # Tensors were allocated on the side stream but are used on the main one
+        inputs.record_stream(torch.cuda.current_stream())
+        targets.record_stream(torch.cuda.current_stream())
+        
+        self._preload()
+        return inputs, targets
+    
+    def _preload(self):
+        try:
+            inputs, targets = next(self._iter)
+        except StopIteration:
+            self.next_inputs = self.next_targets = None
+            return
+        
+        with torch.cuda.stream(self.stream):
+            self.next_inputs = inputs.to(self.device, non_blocking=True)
+            self.next_targets = targets.to(self.device, non_blocking=True)
+
+
+def train_epoch(model, train_loader, criterion, optimizer, device, normalize, scaler, amp_dtype=None):
     """Train for one epoch."""
     model.train()
     running_loss = 0.0
     correct = 0
     total = 0
     
+    if device.type == 'cuda':
+        train_loader = CUDAPrefetcher(train_loader, device)
+    
     for batch_idx, (inputs, targets) in enumerate(train_loader):
-        inputs, targets = inputs.to(device), targets.to(device)
+        # No-op for batches already moved by the prefetcher
+        inputs = normalize(inputs.to(device, non_blocking=True))
+        targets = targets.to(device, non_blocking=True)
         
-        optimizer.zero_grad()
-        outputs = model(inputs)
-        loss = criterion(outputs, targets)
-        loss.backward()
-        optimizer.step()
+        # Drop gradients instead of writing zeros into them
+        optimizer.zero_grad(set_to_none=True)
+        with torch.autocast(device_type=device.type, dtype=amp_dtype, enabled=amp_dtype is not None):
+            outputs = model(inputs)
+            loss = criterion(outputs, targets)
+        
+        # The scaler is a pass-through unless training in float16
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+        scaler.update()
         
         running_loss += loss.item()
         _, predicted = outputs.max(1)
@@ -49,7 +154,7 @@ def train_epoch(model, train_loader, criterion, optimizer, device):
     return running_loss / len(train_loader), 100. * correct / total
 
 
-def test(model, test_loader, criterion, device):
+def test(model, test_loader, criterion, device, normalize, amp_dtype=None):
     """Test the model."""
     model.eval()
     test_loss = 0
@@ -58,9 +163,11 @@ def test(model, test_loader, criterion, device):
     
     with torch.no_grad():
         for inputs, targets in test_loader:
-            inputs, targets = inputs.to(device), targets.to(device)
-            outputs = model(inputs)
-            loss = criterion(outputs, targets)
+            inputs = normalize(inputs.to(device, non_blocking=True))
+            targets = targets.to(device, non_blocking=True)
+            with torch.autocast(device_type=device.type, dtype=amp_dtype, enabled=amp_dtype is not None):
+                outputs = model(inputs)
+                loss = criterion(outputs, targets)
             
             test_loss += loss.item()
             _, predicted = outputs.max(1)
@@ -81,34 +188,49 @@ def main():
     print(f"Using device: {device}")
     
     # Data preparation
+    # Workers only crop/flip uint8 images; normalization happens on the device
     print("Preparing CIFAR-10 dataset...")
-    transform_train = transforms.Compose([
-        transforms.RandomCrop(32, padding=4),
-        transforms.RandomHorizontalFlip(),
-        transforms.ToTensor(),
-        transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010))
+    transform_train = v2.Compose([
+        v2.ToImage(),
+        v2.RandomCrop(32, padding=4),
+        v2.RandomHorizontalFlip()
     ])
     
-    transform_test = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010))
-    ])
+    transform_test = v2.ToImage()
+    normalize = DeviceNormalize(CIFAR10_MEAN, CIFAR10_STD, device)
     
     trainset = torchvision.datasets.CIFAR10(
         root='./data', train=True, download=True, transform=transform_train
     )
-    train_loader = DataLoader(trainset, batch_size=batch_size, shuffle=True, num_workers=2)
-    
     testset = torchvision.datasets.CIFAR10(
         root='./data', train=False, download=True, transform=transform_test
     )
-    test_loader = DataLoader(testset, batch_size=batch_size, shuffle=False, num_workers=2)
+    
+    # Workers persist across epochs and keep 4 batches each in flight
+    num_workers = best_num_workers(trainset, batch_size)
+    print(f"Using {num_workers} DataLoader workers")
+    loader_kwargs = {
+        'batch_size': batch_size,
+        'num_workers': num_workers,
+        'pin_memory': device.type == 'cuda',
+        'persistent_workers': True,
+        'prefetch_factor': 4
+    }
+    train_loader = DataLoader(trainset, shuffle=True, **loader_kwargs)
+    test_loader = DataLoader(testset, shuffle=False, **loader_kwargs)
     
     # Create model
     model = create_model().to(device)
     criterion = nn.CrossEntropyLoss()
     optimizer = optim.SGD(model.parameters(), lr=learning_rate, momentum=0.9, weight_decay=5e-4)
     
+    # Mixed precision and Inductor compilation on Volta (SM 7.0) or newer
+    amp_dtype = select_amp_dtype(device)
+    if amp_dtype is not None:
+        model = torch.compile(model, mode='reduce-overhead')
+        print(f"Using mixed precision: {amp_dtype}")
+    scaler = torch.amp.GradScaler(device.type, enabled=amp_dtype == torch.float16)
+    
     # =================================================================
     # START MRV TRACKING
     # =================================================================
@@ -130,11 +252,16 @@ def main():
         # Training loop
         for epoch in range(epochs):
             print(f"Epoch {epoch+1}/{epochs}")
-            train_loss, train_acc = train_epoch(model, train_loader, criterion, optimizer, device)
-            test_loss, test_acc = test(model, test_loader, criterion, device)
+            train_loss, train_acc = train_epoch(
+                model, train_loader, criterion, optimizer, device, normalize, scaler, amp_dtype
+            )
+            test_loss, test_acc = test(model, test_loader, criterion, device, normalize, amp_dtype)
             
             print(f"Train Loss: {train_loss:.3f} | Train Acc: {train_acc:.2f}%")
             print(f"Test Loss: {test_loss:.3f} | Test Acc: {test_acc:.2f}%\n")
+            
+            # Record per-epoch wall time in the MRV record
+            tracker.log_epoch()
         
         # Training complete - MRV data will be automatically saved when exiting context
     
@@ -161,4 +288,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Show MRV tracker progress messages
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
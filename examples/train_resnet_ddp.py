@@ -0,0 +1,147 @@
+"""
+Example: Multi-GPU ResNet18 on CIFAR-10 with DistributedDataParallel and MRV Tracking
+
+Launch one process per GPU with torchrun:
+    torchrun --nproc_per_node=4 examples/train_resnet_ddp.py
+
+Only rank 0 runs the MRV tracker. CodeCarbon measures every GPU and the
+CPU of the machine it runs on, so a single tracker covers the whole
+single-node job and energy is not counted once per process.
+"""
+
+import logging
+import os
+from contextlib import nullcontext
+
+import torch
+import torch.distributed as dist
+import torch.nn as nn
+import torch.optim as optim
+import torchvision
+from torch.nn.parallel import DistributedDataParallel as DDP
+from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
+from torchvision.transforms import v2
+
+# Import MRV wrapper
+from mrv_wrapper import MRVTracker
+
+from train_resnet import (
+    CIFAR10_MEAN,
+    CIFAR10_STD,
+    DeviceNormalize,
+    create_model,
+    select_amp_dtype,
+    test,
+    train_epoch
+)
+
+
+def main():
+    # Configuration
+    batch_size = 128  # Per GPU
+    epochs = 5  # Reduced for demo purposes (normally 90)
+    learning_rate = 0.1
+    
+    # One process per GPU; NCCL all-reduces gradients during backward
+    dist.init_process_group('nccl')
+    rank = dist.get_rank()
+    world_size = dist.get_world_size()
+    local_rank = int(os.environ["LOCAL_RANK"])
+    torch.cuda.set_device(local_rank)
+    device = torch.device('cuda', local_rank)
+    
+    if rank == 0:
+        print(f"Training on {world_size} GPUs")
+    
+    # Data preparation
+    transform_train = v2.Compose([
+        v2.ToImage(),
+        v2.RandomCrop(32, padding=4),
+        v2.RandomHorizontalFlip()
+    ])
+    transform_test = v2.ToImage()
+    normalize = DeviceNormalize(CIFAR10_MEAN, CIFAR10_STD, device)
+    
+    # Download once on rank 0, then let the other ranks read the files
+    if rank == 0:
+        torchvision.datasets.CIFAR10(root='./data', train=True, download=True)
+        torchvision.datasets.CIFAR10(root='./data', train=False, download=True)
+    dist.barrier()
+    
+    trainset = torchvision.datasets.CIFAR10(root='./data', train=True, transform=transform_train)
+    testset = torchvision.datasets.CIFAR10(root='./data', train=False, transform=transform_test)
+    
+    # Split the CPUs between the ranks of this node
+    num_workers = max(1, min(8, (os.cpu_count() or 2) // (2 * world_size)))
+    loader_kwargs = {
+        'batch_size': batch_size,
+        'num_workers': num_workers,
+        'pin_memory': True,
+        'persistent_workers': True,
+        'prefetch_factor': 4
+    }
+    
+    # Each rank sees a disjoint shard of the training set
+    train_sampler = DistributedSampler(trainset, shuffle=True)
+    train_loader = DataLoader(trainset, sampler=train_sampler, **loader_kwargs)
+    test_loader = DataLoader(testset, shuffle=False, **loader_kwargs)
+    
+    # Create model
+    model = create_model().to(device)
+    ddp_model = DDP(model, device_ids=[local_rank])
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.SGD(ddp_model.parameters(), lr=learning_rate, momentum=0.9, weight_decay=5e-4)
+    
+    amp_dtype = select_amp_dtype(device)
+    scaler = torch.amp.GradScaler('cuda', enabled=amp_dtype == torch.float16)
+    
+    # =================================================================
+    # START MRV TRACKING (rank 0 only)
+    # =================================================================
+    tracking = MRVTracker(
+        experiment_name="resnet18_cifar10_ddp",
+        model_name="ResNet18",
+        dataset_name="CIFAR-10",
+        epochs=epochs,
+        batch_size=batch_size * world_size,  # Global batch size
+        framework="PyTorch",
+        blockchain_enabled=True,
+        auto_anchor=True
+    ) if rank == 0 else nullcontext()
+    
+    with tracking as tracker:
+        for epoch in range(epochs):
+            # Reshuffle the shards every epoch
+            train_sampler.set_epoch(epoch)
+            
+            train_loss, train_acc = train_epoch(
+                ddp_model, train_loader, criterion, optimizer, device, normalize, scaler, amp_dtype
+            )
+            
+            # Evaluate the unwrapped model on rank 0; DDP forward passes
+            # are collective and would block on the other ranks
+            if rank == 0:
+                test_loss, test_acc = test(model, test_loader, criterion, device, normalize, amp_dtype)
+                print(f"Epoch {epoch+1}/{epochs}")
+                print(f"Train Loss (rank 0): {train_loss:.3f} | Train Acc (rank 0): {train_acc:.2f}%")
+                print(f"Test Loss: {test_loss:.3f} | Test Acc: {test_acc:.2f}%\n")
+            dist.barrier()
+    
+    # =================================================================
+    # MRV TRACKING COMPLETE
+    # =================================================================
+    
+    if rank == 0:
+        print(f"\n✅ MRV ID: {tracker.mrv_id}")
+        print(f"✅ Hash: {tracker.get_hash()}")
+        if tracker.tx_hash:
+            print(f"✅ Blockchain TX: {tracker.tx_hash}")
+    
+    dist.destroy_process_group()
+
+
+if __name__ == "__main__":
+    # Show MRV tracker progress messages
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main()
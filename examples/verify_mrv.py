@@ -5,6 +5,7 @@ Usage:
     python verify_mrv.py <mrv_id> <json_file>
 """
 
+import logging
 import sys
 import json
 from pathlib import Path
@@ -83,6 +84,9 @@ def verify_mrv(mrv_id: str, json_file: str):
 
 
 if __name__ == "__main__":
+    # Show blockchain connection errors
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     if len(sys.argv) != 3:
         print("Usage: python verify_mrv.py <mrv_id> <json_file>")
         print("\nExample:")
@@ -8,7 +8,56 @@ and blockchain-based integrity verification for ML training workloads.
 __version__ = "0.1.0"
 __author__ = "Your Name"
 
+import logging
+import os
+
+# Library logging: silent unless the application configures logging or
+# MRV_LOG_LEVEL is set (e.g. MRV_LOG_LEVEL=INFO)
+_logger = logging.getLogger(__name__)
+_logger.addHandler(logging.NullHandler())
+
+if os.getenv("MRV_LOG_LEVEL"):
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(_handler)
+    # Messages already go to stderr here; don't repeat them through
+    # handlers the application configures on the root logger
+    _logger.propagate = False
+    
+    # getLevelName maps known names to their number and anything else to a
+    # string, so a typo falls back to INFO instead of failing the import
+    _level = logging.getLevelName(os.environ["MRV_LOG_LEVEL"].upper())
+    if isinstance(_level, int):
+        _logger.setLevel(_level)
+    else:
+        _logger.setLevel(logging.INFO)
+        _logger.warning(
+            "Unknown MRV_LOG_LEVEL %r; using INFO.", os.environ["MRV_LOG_LEVEL"]
+        )
+
 from .tracker import MRVTracker
-from .utils import compute_hash, validate_mrv_json
+from .utils import (
+    compute_hash,
+    compute_hashes,
+    compute_hashes_parallel,
+    merkle_root,
+    validate_mrv_json,
+    validate_mrv_batch
+)
+
+__all__ = [
+    "MRVTracker",
+    "compute_hash",
+    "compute_hashes",
+    "compute_hashes_parallel",
+    "merkle_root",
+    "validate_mrv_json",
+    "validate_mrv_batch",
+]
 
-__all__ = ["MRVTracker", "compute_hash", "validate_mrv_json"]
+# Needs the [blockchain] extra (web3)
+try:
+    from .blockchain import BatchAnchorQueue, batch_anchor_queue
+    __all__ += ["BatchAnchorQueue", "batch_anchor_queue"]
+except ImportError:
+    pass
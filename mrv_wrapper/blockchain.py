@@ -2,13 +2,55 @@
 Blockchain integration module for MRV hash anchoring.
 """
 
+import atexit
+import logging
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from eth_abi import decode as abi_decode, encode as abi_encode
+from hexbytes import HexBytes
+from requests import Session
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Single background worker that waits for anchoring receipts, so callers
+# can return as soon as a transaction is broadcast
+_receipt_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mrv-receipt")
+atexit.register(_receipt_executor.shutdown, wait=True)
+
+# Keep-alive HTTP session shared by every connector, so RPC calls reuse
+# pooled connections instead of opening a new TCP/TLS connection each
+_w3_session = Session()
+_w3_session.mount('http://', HTTPAdapter(pool_maxsize=16))
+_w3_session.mount('https://', HTTPAdapter(pool_maxsize=16))
+
+# Serializes building and sending transactions, so two threads never read
+# the same 'pending' nonce before either transaction reaches the node
+_nonce_lock = threading.Lock()
+
+# Gas limit reserved for each MRV record in a transaction
+GAS_PER_RECORD = 200000
+
+# Seconds a fetched gas price is reused before querying the node again
+GAS_PRICE_TTL = 30.0
+
+# Seconds a BatchAnchorQueue waits after a failed send before a full queue
+# triggers another attempt
+BATCH_RETRY_DELAY = 60.0
+
+# 4-byte function selectors, so calldata can be built without going
+# through Web3's contract function dispatch
+REGISTER_MRV_SELECTOR = bytes(Web3.keccak(text="registerMRV(string,bytes32)")[:4])
+REGISTER_MRV_BATCH_SELECTOR = bytes(Web3.keccak(text="registerMRVBatch(string[],bytes32[])")[:4])
+GET_MRV_HASH_SELECTOR = bytes(Web3.keccak(text="getMRVHash(string)")[:4])
+
 
 class BlockchainConnector:
     """Handles blockchain interactions for MRV hash anchoring."""
@@ -32,9 +74,20 @@ class BlockchainConnector:
         self.private_key = private_key or os.getenv("PRIVATE_KEY")
         
         # Initialize Web3
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        self.w3 = Web3(Web3.HTTPProvider(
+            self.rpc_url,
+            session=_w3_session,
+            request_kwargs={'timeout': 10}
+        ))
         self.contract = None
         self.account = None
+        self._checksum_address = None
+        
+        # Fetched on first transaction; the gas price is refreshed after
+        # GAS_PRICE_TTL seconds
+        self._chain_id = None
+        self._gas_price = None
+        self._gas_price_time = 0.0
         
         # Load contract if address provided
         if self.contract_address:
@@ -58,6 +111,16 @@ class BlockchainConnector:
                 "stateMutability": "nonpayable",
                 "type": "function"
             },
+            {
+                "inputs": [
+                    {"name": "mrvIds", "type": "string[]"},
+                    {"name": "hashes", "type": "bytes32[]"}
+                ],
+                "name": "registerMRVBatch",
+                "outputs": [],
+                "stateMutability": "nonpayable",
+                "type": "function"
+            },
             {
                 "inputs": [{"name": "mrvId", "type": "string"}],
                 "name": "getMRVHash",
@@ -89,8 +152,9 @@ class BlockchainConnector:
             }
         ]
         
+        self._checksum_address = Web3.to_checksum_address(self.contract_address)
         self.contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(self.contract_address),
+            address=self._checksum_address,
             abi=contract_abi
         )
     
@@ -108,7 +172,7 @@ class BlockchainConnector:
     
     def anchor_hash(self, mrv_id: str, hash_value: str) -> Optional[str]:
         """
-        Anchor MRV hash on blockchain.
+        Anchor MRV hash on blockchain and wait for confirmation.
         
         Args:
             mrv_id: MRV ID
@@ -117,52 +181,196 @@ class BlockchainConnector:
         Returns:
             Transaction hash or None if failed
         """
-        if not self.is_connected():
-            print("⚠️  Warning: Not connected to blockchain. Skipping hash anchoring.")
+        tx_hash_hex = self.submit_hash(mrv_id, hash_value)
+        if tx_hash_hex is None:
             return None
         
-        if not self.contract or not self.account:
-            print("⚠️  Warning: Contract or account not configured. Skipping hash anchoring.")
+        receipt = self._wait_for_receipt(tx_hash_hex)
+        if receipt["status"] != "confirmed":
             return None
+        return tx_hash_hex
+    
+    def anchor_batch(self, pairs: List[Tuple[str, str]]) -> Optional[str]:
+        """
+        Anchor several MRV hashes in a single transaction and wait for
+        confirmation.
         
-        try:
-            # Convert hex hash to bytes32
-            hash_bytes = bytes.fromhex(hash_value)
-            
-            # Build transaction
-            nonce = self.w3.eth.get_transaction_count(self.account.address)
+        Args:
+            pairs: List of (MRV ID, SHA-256 hash hex string) tuples
             
-            transaction = self.contract.functions.registerMRV(
-                mrv_id,
-                hash_bytes
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': nonce,
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price
-            })
+        Returns:
+            Transaction hash or None if failed
+        """
+        tx_hash_hex = self.submit_batch(pairs)
+        if tx_hash_hex is None:
+            return None
+        
+        receipt = self._wait_for_receipt(tx_hash_hex)
+        if receipt["status"] != "confirmed":
+            return None
+        return tx_hash_hex
+    
+    def submit_batch(self, pairs: List[Tuple[str, str]]) -> Optional[str]:
+        """
+        Broadcast a registerMRVBatch transaction without waiting for it to
+        be mined.
+        
+        Args:
+            pairs: List of (MRV ID, SHA-256 hash hex string) tuples
             
-            # Sign and send transaction
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.private_key
-            )
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        Returns:
+            Transaction hash or None if the transaction could not be sent
+        """
+        if not pairs:
+            return None
+        
+        if not self.contract:
+            logger.warning("Contract or account not configured. Skipping hash anchoring.")
+            return None
+        
+        mrv_ids = [mrv_id for mrv_id, _ in pairs]
+        hashes = [bytes.fromhex(hash_value) for _, hash_value in pairs]
+        
+        calldata = REGISTER_MRV_BATCH_SELECTOR + abi_encode(
+            ['string[]', 'bytes32[]'],
+            [mrv_ids, hashes]
+        )
+        return self._send_transaction(calldata, gas=GAS_PER_RECORD * len(pairs))
+    
+    def submit_hash(self, mrv_id: str, hash_value: str) -> Optional[str]:
+        """
+        Broadcast an MRV hash anchoring transaction without waiting for it
+        to be mined.
+        
+        Args:
+            mrv_id: MRV ID
+            hash_value: SHA-256 hash (hex string)
             
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        Returns:
+            Transaction hash or None if the transaction could not be sent
+        """
+        if not self.contract:
+            logger.warning("Contract or account not configured. Skipping hash anchoring.")
+            return None
+        
+        # Convert hex hash to bytes32
+        hash_bytes = bytes.fromhex(hash_value)
+        
+        calldata = REGISTER_MRV_SELECTOR + abi_encode(
+            ['string', 'bytes32'],
+            [mrv_id, hash_bytes]
+        )
+        return self._send_transaction(calldata, gas=GAS_PER_RECORD)
+    
+    def _send_transaction(self, calldata: bytes, gas: int) -> Optional[str]:
+        """
+        Build, sign and broadcast a transaction to the MRVRegistry contract.
+        
+        Args:
+            calldata: ABI-encoded function selector and arguments
+            gas: Gas limit for the transaction
             
-            if receipt['status'] == 1:
-                tx_hash_hex = tx_hash.hex()
-                print(f"✅ Hash anchored on blockchain: {tx_hash_hex[:10]}...")
-                return tx_hash_hex
-            else:
-                print("❌ Transaction failed")
-                return None
+        Returns:
+            Transaction hash or None if the transaction could not be sent
+        """
+        if not self.is_connected():
+            logger.warning("Not connected to blockchain. Skipping hash anchoring.")
+            return None
+        
+        if not self.account:
+            logger.warning("Contract or account not configured. Skipping hash anchoring.")
+            return None
+        
+        with _nonce_lock:
+            try:
+                # Build transaction; 'pending' counts transactions that are
+                # broadcast but not yet mined
+                nonce = self.w3.eth.get_transaction_count(self.account.address, 'pending')
                 
+                if self._chain_id is None:
+                    self._chain_id = self.w3.eth.chain_id
+                now = time.monotonic()
+                if self._gas_price is None or now - self._gas_price_time > GAS_PRICE_TTL:
+                    self._gas_price = self.w3.eth.gas_price
+                    self._gas_price_time = now
+                
+                transaction = {
+                    'to': self._checksum_address,
+                    'value': 0,
+                    'data': calldata,
+                    'nonce': nonce,
+                    'gas': gas,
+                    'gasPrice': self._gas_price,
+                    'chainId': self._chain_id
+                }
+                
+                # Sign and send transaction
+                signed_txn = self.account.sign_transaction(transaction)
+                tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+                
+                return tx_hash.hex()
+                
+            except Exception as e:
+                logger.error("Failed to anchor hash: %s", e)
+                return None
+    
+    def await_receipt_async(
+        self,
+        mrv_id: str,
+        tx_hash: str,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Future:
+        """
+        Wait for an anchoring transaction receipt in the background.
+        
+        Args:
+            mrv_id: MRV ID the transaction anchors (comma-separated IDs
+                for a batch)
+            tx_hash: Transaction hash returned by submit_hash
+            callback: Called with the receipt status dictionary once known
+            
+        Returns:
+            Future resolving to the receipt status dictionary
+        """
+        def wait():
+            receipt = {"mrv_id": mrv_id, **self._wait_for_receipt(tx_hash)}
+            if callback is not None:
+                callback(receipt)
+            return receipt
+        
+        return _receipt_executor.submit(wait)
+    
+    def _wait_for_receipt(self, tx_hash: str) -> Dict[str, Any]:
+        """
+        Block until a transaction is mined and summarize its receipt.
+        
+        Args:
+            tx_hash: Transaction hash (hex string)
+            
+        Returns:
+            Dictionary with transaction hash, status, and block data
+        """
+        result = {"tx_hash": tx_hash}
+        
+        try:
+            receipt = self.w3.eth.wait_for_transaction_receipt(HexBytes(tx_hash))
         except Exception as e:
-            print(f"❌ Failed to anchor hash: {e}")
-            return None
+            logger.error("Failed to anchor hash: %s", e)
+            result.update({"status": "error", "error": str(e)})
+            return result
+        
+        if receipt['status'] == 1:
+            logger.info("✅ Hash anchored on blockchain: %s...", tx_hash[:10])
+            result["status"] = "confirmed"
+        else:
+            logger.error("Transaction failed")
+            result["status"] = "failed"
+        
+        result.update({
+            "block_number": receipt['blockNumber'],
+            "gas_used": receipt['gasUsed']
+        })
+        return result
     
     def get_hash(self, mrv_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -178,8 +386,14 @@ class BlockchainConnector:
             return None
         
         try:
-            result = self.contract.functions.getMRVHash(mrv_id).call()
-            hash_bytes, timestamp, submitter = result
+            result = self.w3.eth.call({
+                'to': self._checksum_address,
+                'data': GET_MRV_HASH_SELECTOR + abi_encode(['string'], [mrv_id])
+            })
+            hash_bytes, timestamp, submitter = abi_decode(
+                ['bytes32', 'uint256', 'address'],
+                result
+            )
             
             # Check if registered
             if timestamp == 0:
@@ -188,10 +402,10 @@ class BlockchainConnector:
             return {
                 "hash": hash_bytes.hex(),
                 "timestamp": timestamp,
-                "submitter": submitter
+                "submitter": Web3.to_checksum_address(submitter)
             }
         except Exception as e:
-            print(f"❌ Failed to retrieve hash: {e}")
+            logger.error("Failed to retrieve hash: %s", e)
             return None
     
     def verify_hash(self, mrv_id: str, expected_hash: str) -> bool:
@@ -210,3 +424,115 @@ class BlockchainConnector:
             return False
         
         return blockchain_data["hash"] == expected_hash
+
+
+class BatchAnchorQueue:
+    """
+    Collects MRV hashes and anchors them with a single registerMRVBatch
+    transaction, amortizing transaction overhead across sweep runs.
+    
+    The queue is flushed when it reaches max_size and at interpreter exit.
+    A batch that cannot be sent is put back and retried, but a full queue
+    only triggers the retry once retry_delay has passed. A batch that is
+    mined but reverts (e.g. because one MRV ID is already registered) is
+    not retried; its pairs are logged and kept in failed.
+    """
+    
+    def __init__(self, max_size: int = 20, retry_delay: float = BATCH_RETRY_DELAY):
+        """
+        Initialize batch anchor queue.
+        
+        Args:
+            max_size: Number of pending records that triggers a flush
+            retry_delay: Seconds to wait after a failed send before a full
+                queue triggers another flush
+        """
+        self.max_size = max_size
+        self.retry_delay = retry_delay
+        self.connector = None
+        self.failed: List[Tuple[str, str]] = []
+        self.receipt_future = None
+        self._pending: List[Tuple[str, str]] = []
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        
+        atexit.register(self.flush)
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def add(self, mrv_id: str, hash_value: str, connector: BlockchainConnector):
+        """
+        Queue an MRV hash for anchoring.
+        
+        Args:
+            mrv_id: MRV ID
+            hash_value: SHA-256 hash (hex string)
+            connector: Connector used for the flush if none is set yet
+        """
+        with self._lock:
+            if self.connector is None:
+                self.connector = connector
+            self._pending.append((mrv_id, hash_value))
+            full = (
+                len(self._pending) >= self.max_size
+                and time.monotonic() >= self._retry_at
+            )
+        
+        if full:
+            self.flush()
+    
+    def flush(self) -> Optional[str]:
+        """
+        Broadcast all pending MRV hashes in one transaction.
+        
+        The receipt is awaited in the background (see receipt_future). If
+        the transaction cannot be sent, the hashes are put back in the
+        queue.
+        
+        Returns:
+            Transaction hash or None if nothing was sent
+        """
+        with self._lock:
+            pairs, self._pending = self._pending, []
+        
+        if not pairs or self.connector is None:
+            return None
+        
+        mrv_ids = ", ".join(mrv_id for mrv_id, _ in pairs)
+        tx_hash = self.connector.submit_batch(pairs)
+        if tx_hash is None:
+            with self._lock:
+                self._pending[:0] = pairs
+                self._retry_at = time.monotonic() + self.retry_delay
+            logger.error(
+                "Could not send batch; %d MRV records queued for retry: %s",
+                len(pairs),
+                mrv_ids
+            )
+            return None
+        
+        with self._lock:
+            self._retry_at = 0.0
+        
+        def on_receipt(receipt: Dict[str, Any]):
+            if receipt["status"] == "confirmed":
+                return
+            with self._lock:
+                self.failed.extend(pairs)
+            logger.error(
+                "Batch transaction %s %s; %d MRV records not anchored: %s",
+                tx_hash,
+                receipt["status"],
+                len(pairs),
+                mrv_ids
+            )
+        
+        self.receipt_future = self.connector.await_receipt_async(
+            mrv_ids, tx_hash, callback=on_receipt
+        )
+        return tx_hash
+
+
+# Shared queue used by MRVTracker(batch_anchor=True)
+batch_anchor_queue = BatchAnchorQueue()
@@ -0,0 +1,104 @@
+"""
+DataLoader worker-count tuning for PyTorch training loops.
+"""
+
+import json
+import os
+import platform
+import socket
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+CACHE_PATH = Path.home() / ".mrv_cache" / "dpt.json"
+
+
+def default_num_workers() -> int:
+    """
+    Heuristic worker count: half the CPUs, capped at 8.
+    
+    Returns:
+        Number of DataLoader workers
+    """
+    return max(1, min(8, (os.cpu_count() or 2) // 2))
+
+
+def best_num_workers(
+    dataset: Any,
+    batch_size: int,
+    candidates: Sequence[int] = (2, 4, 8),
+    num_batches: int = 30
+) -> int:
+    """
+    Pick the DataLoader worker count with the highest measured throughput.
+    
+    Each candidate loads num_batches batches and the fastest one wins. The
+    result is cached per host, dataset and batch size in ~/.mrv_cache/dpt.json
+    so the measurement only runs once. On Windows, where workers are started
+    with spawn and probing is expensive, the heuristic default is returned.
+    
+    Args:
+        dataset: PyTorch dataset to load
+        batch_size: Training batch size
+        candidates: Worker counts to try
+        num_batches: Batches to load per candidate
+    
+    Returns:
+        Number of DataLoader workers
+    """
+    if platform.system() == "Windows":
+        return default_num_workers()
+    
+    key = f"{socket.gethostname()}|{type(dataset).__name__}|{len(dataset)}|{batch_size}"
+    cache = _load_cache()
+    if key in cache:
+        return cache[key]
+    
+    from torch.utils.data import DataLoader
+    
+    cpu_count = os.cpu_count() or 2
+    best, best_rate = default_num_workers(), 0.0
+    
+    for num_workers in candidates:
+        if num_workers > cpu_count:
+            continue
+        
+        loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=num_workers)
+        batches = iter(loader)
+        
+        # Exclude worker start-up from the measurement
+        next(batches, None)
+        
+        samples = 0
+        start = time.perf_counter()
+        for _, (inputs, _) in zip(range(num_batches), batches):
+            samples += len(inputs)
+        rate = samples / max(time.perf_counter() - start, 1e-9)
+        
+        del batches, loader
+        
+        if rate > best_rate:
+            best, best_rate = num_workers, rate
+    
+    cache[key] = best
+    _save_cache(cache)
+    return best
+
+
+def _load_cache() -> dict:
+    """Load cached worker counts, ignoring a missing or corrupt file."""
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict):
+    """Persist cached worker counts."""
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    except OSError:
+        pass
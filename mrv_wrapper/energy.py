@@ -0,0 +1,207 @@
+"""
+Direct GPU energy measurement via NVML.
+"""
+
+import functools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+try:
+    import numpy as np
+    import pynvml
+    NVML_AVAILABLE = True
+except ImportError:
+    NVML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Assumed CPU package power when no measurement is available
+DEFAULT_CPU_TDP_W = 85.0
+
+
+@functools.lru_cache(maxsize=1)
+def estimate_tdp_watts() -> float:
+    """
+    Estimate full-load power of the machine from device power limits.
+    
+    Sums the NVML power management limit of every GPU and adds
+    DEFAULT_CPU_TDP_W for the CPU. The result is cached for the process.
+    
+    Returns:
+        Estimated power draw in watts
+    """
+    gpu_w = 0.0
+    if NVML_AVAILABLE:
+        try:
+            pynvml.nvmlInit()
+            try:
+                for i in range(pynvml.nvmlDeviceGetCount()):
+                    handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+                    # Reported in milliwatts
+                    gpu_w += pynvml.nvmlDeviceGetPowerManagementLimit(handle) / 1000.0
+            finally:
+                pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            gpu_w = 0.0
+    
+    return DEFAULT_CPU_TDP_W + gpu_w
+
+
+class PowerSampler:
+    """
+    Samples GPU board power through NVML and integrates it into energy.
+    
+    Samples are written into preallocated numpy buffers by a background
+    thread; when a buffer fills up it is integrated and reused, so memory
+    stays constant for arbitrarily long runs.
+    """
+    
+    def __init__(self, interval: float = 1.0, buffer_size: int = 4096):
+        """
+        Initialize power sampler.
+        
+        Args:
+            interval: Seconds between power samples
+            buffer_size: Number of samples held before folding into the total
+        """
+        self.interval = interval
+        self.buffer_size = buffer_size
+        
+        self._handles: List = []
+        self._times = np.empty(buffer_size, dtype=np.float64)
+        self._power = np.empty(buffer_size, dtype=np.float32)
+        self._count = 0
+        self._energy_j = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._failed = False
+    
+    @staticmethod
+    def is_supported() -> bool:
+        """
+        Check whether NVML is usable and every GPU reports its power draw.
+        
+        Returns:
+            True if GPU power can be sampled
+        """
+        if not NVML_AVAILABLE:
+            return False
+        
+        try:
+            pynvml.nvmlInit()
+            try:
+                count = pynvml.nvmlDeviceGetCount()
+                for i in range(count):
+                    pynvml.nvmlDeviceGetPowerUsage(pynvml.nvmlDeviceGetHandleByIndex(i))
+                return count > 0
+            finally:
+                pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            return False
+    
+    def start(self) -> bool:
+        """
+        Open NVML and start sampling in the background.
+        
+        Returns:
+            True if sampling started; False if NVML failed, in which case
+            NVML is closed again
+        """
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError as e:
+            logger.warning("Could not open NVML: %s", e)
+            return False
+        
+        try:
+            self._handles = [
+                pynvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+            
+            self._count = 0
+            self._energy_j = 0.0
+            self._failed = False
+            self._stop_event.clear()
+            self._sample()
+        except pynvml.NVMLError as e:
+            logger.warning("Could not sample GPU power: %s", e)
+            self._shutdown()
+            return False
+        
+        self._thread = threading.Thread(target=self._run, name="mrv-power", daemon=True)
+        self._thread.start()
+        return True
+    
+    def stop(self) -> Optional[float]:
+        """
+        Stop sampling and close NVML.
+        
+        Returns:
+            Energy consumed by all GPUs since start, in kWh, or None if
+            sampling failed during the run
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        
+        try:
+            if not self._failed:
+                self._sample()
+                self._fold()
+        except pynvml.NVMLError as e:
+            logger.warning("GPU power sampling failed: %s", e)
+            self._failed = True
+        finally:
+            self._shutdown()
+        
+        if self._failed:
+            return None
+        return self._energy_j / 3.6e6
+    
+    def _run(self):
+        """Sampling loop executed by the background thread."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._sample()
+            except pynvml.NVMLError as e:
+                logger.warning("GPU power sampling failed: %s", e)
+                self._failed = True
+                return
+    
+    @staticmethod
+    def _shutdown():
+        """Close NVML, ignoring errors from an already broken driver."""
+        try:
+            pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            pass
+    
+    def _sample(self):
+        """Record the current total power draw in watts."""
+        if self._count == self.buffer_size:
+            self._fold()
+        
+        # nvmlDeviceGetPowerUsage reports milliwatts
+        power_mw = sum(pynvml.nvmlDeviceGetPowerUsage(h) for h in self._handles)
+        self._times[self._count] = time.monotonic()
+        self._power[self._count] = power_mw / 1000.0
+        self._count += 1
+    
+    def _fold(self):
+        """Integrate buffered samples (trapezoidal rule) into the total."""
+        n = self._count
+        if n > 1:
+            power = self._power[:n]
+            self._energy_j += 0.5 * float(
+                np.dot(power[1:] + power[:-1], np.diff(self._times[:n]))
+            )
+        
+        # Keep the last sample as the start of the next segment
+        if n > 0:
+            self._times[0] = self._times[n - 1]
+            self._power[0] = self._power[n - 1]
+            self._count = 1
@@ -0,0 +1,58 @@
+"""
+Columnar (structure-of-arrays) buffer for per-epoch MRV measurements.
+"""
+
+import math
+from array import array
+from typing import Dict, List, Optional
+
+
+class MRVBuffer:
+    """
+    Per-epoch measurements stored as one typed array per field.
+    
+    Each field is a contiguous machine-typed buffer rather than a list of
+    per-epoch dicts, so long runs cost 16 bytes per epoch and no Python
+    objects are created until the record is serialized.
+    """
+    
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.energy_kwh = array('d')
+        self.duration_seconds = array('q')
+    
+    def __len__(self) -> int:
+        return len(self.energy_kwh)
+    
+    def append(self, energy_kwh: Optional[float], duration_seconds: int):
+        """
+        Record one epoch.
+        
+        Args:
+            energy_kwh: Energy consumed during the epoch in kWh, or None if
+                not measured (stored as NaN)
+            duration_seconds: Wall time of the epoch in seconds
+        """
+        self.energy_kwh.append(math.nan if energy_kwh is None else energy_kwh)
+        self.duration_seconds.append(duration_seconds)
+    
+    def clear(self):
+        """Drop all recorded epochs."""
+        del self.energy_kwh[:]
+        del self.duration_seconds[:]
+    
+    def to_dict(self) -> Dict[str, List]:
+        """
+        Convert to the JSON form stored in the MRV record.
+        
+        Returns:
+            Dictionary mapping field names to per-epoch lists; unmeasured
+            energy is None
+        """
+        return {
+            "energy_kwh": [
+                None if math.isnan(value) else round(value, 6)
+                for value in self.energy_kwh
+            ],
+            "duration_seconds": self.duration_seconds.tolist()
+        }
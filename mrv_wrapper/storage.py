@@ -3,12 +3,37 @@ Storage module for MRV data persistence.
 """
 
 import json
+import logging
 import os
 import uuid
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 from datetime import datetime
 
+from .utils import _orjson_dumps
+
+logger = logging.getLogger(__name__)
+
+
+def _write_json(data: Dict[str, Any], filepath: Path):
+    """
+    Write data as indented, key-sorted JSON.
+    
+    Uses orjson when available. Its output differs from json.dump only in
+    formatting, so loading the file yields the same data and hash; data
+    orjson would encode differently (e.g. NaN, which it turns into null)
+    goes through json.dump instead.
+    
+    Args:
+        data: JSON-serializable dictionary
+        filepath: Target file path
+    """
+    buf = _orjson_dumps(data, indent=True)
+    if buf is None:
+        buf = json.dumps(data, indent=2, sort_keys=True).encode('utf-8')
+    
+    filepath.write_bytes(buf)
+
 
 class MRVStorage:
     """Handles storage and retrieval of MRV records."""
@@ -50,10 +75,9 @@ class MRVStorage:
         filename = f"{mrv_id}.json"
         filepath = self.storage_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(mrv_data, f, indent=2, sort_keys=True)
+        _write_json(mrv_data, filepath)
         
-        print(f"✅ MRV data saved: {filepath}")
+        logger.info("✅ MRV data saved: %s", filepath)
         return mrv_id
     
     def load_mrv(self, mrv_id: str) -> Optional[Dict[str, Any]]:
@@ -75,6 +99,41 @@ class MRVStorage:
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     
+    def save_receipt(self, mrv_id: str, receipt: Dict[str, Any]) -> Path:
+        """
+        Save blockchain anchoring receipt next to the MRV record.
+        
+        Args:
+            mrv_id: MRV ID
+            receipt: Receipt status dictionary
+            
+        Returns:
+            Path of the receipt file
+        """
+        filepath = self.storage_dir / f"{mrv_id}.receipt.json"
+        _write_json(receipt, filepath)
+        
+        return filepath
+    
+    def iter_mrv_records(self) -> Iterator[str]:
+        """
+        Lazily iterate over MRV records in storage.
+        
+        Uses os.scandir, which reads names without stat()ing every file.
+        
+        Yields:
+            MRV IDs
+        """
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (
+                    name.startswith("MRV-")
+                    and name.endswith(".json")
+                    and not name.endswith(".receipt.json")
+                ):
+                    yield name[:-5]
+    
     def list_mrv_records(self) -> list:
         """
         List all MRV records in storage.
@@ -82,9 +141,7 @@ class MRVStorage:
         Returns:
             List of MRV IDs
         """
-        return [
-            f.stem for f in self.storage_dir.glob("MRV-*.json")
-        ]
+        return list(self.iter_mrv_records())
     
     def export_mrv(self, mrv_id: str, output_path: str) -> bool:
         """
@@ -101,12 +158,43 @@ class MRVStorage:
         if mrv_data is None:
             return False
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(mrv_data, f, indent=2, sort_keys=True)
+        _write_json(mrv_data, Path(output_path))
         
         return True
 
 
+# Shared HTTP session for registry uploads, created on first use
+_SESSION = None
+
+
+def _get_session():
+    """
+    Get the shared registry session with connection pooling and retries.
+    
+    Returns:
+        requests.Session instance
+    """
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # POST is not in Retry's default allowed_methods, so only failed
+        # connections are retried and a record is never uploaded twice
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSION = session
+    
+    return _SESSION
+
+
 def save_to_registry(mrv_data: Dict[str, Any], registry_url: Optional[str] = None) -> bool:
     """
     Save MRV data to centralized registry (optional).
@@ -123,13 +211,12 @@ def save_to_registry(mrv_data: Dict[str, Any], registry_url: Optional[str] = Non
         return True
     
     try:
-        import requests
-        response = requests.post(
+        response = _get_session().post(
             f"{registry_url}/api/mrv",
             json=mrv_data,
-            timeout=10
+            timeout=(3, 10)  # (connect, read)
         )
         return response.status_code == 201
     except Exception as e:
-        print(f"⚠️  Warning: Failed to save to registry: {e}")
+        logger.warning("Failed to save to registry: %s", e)
         return False
@@ -2,9 +2,16 @@
 Core MRV tracking module.
 """
 
+import logging
+import threading
 import time
 from typing import Optional, Dict, Any
-from codecarbon import EmissionsTracker
+
+try:
+    from codecarbon import EmissionsTracker
+    CODECARBON_AVAILABLE = True
+except ImportError:
+    CODECARBON_AVAILABLE = False
 
 from .utils import (
     compute_hash,
@@ -13,7 +20,23 @@ from .utils import (
     format_duration
 )
 from .storage import MRVStorage, save_to_registry
-from .blockchain import BlockchainConnector
+from .energy import PowerSampler, estimate_tdp_watts
+from .soa import MRVBuffer
+
+try:
+    from .blockchain import BlockchainConnector, batch_anchor_queue
+    BLOCKCHAIN_AVAILABLE = True
+except ImportError:
+    BLOCKCHAIN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# CodeCarbon is started only once a run has lasted this long; shorter runs
+# end before its first power sample and are estimated from TDP instead.
+# Longer runs add the TDP estimate for this initial window to CodeCarbon's
+# measurement
+CODECARBON_START_DELAY = 5.0
 
 
 class MRVTracker:
@@ -39,7 +62,9 @@ class MRVTracker:
         storage_dir: str = "mrv_data",
         registry_url: Optional[str] = None,
         blockchain_enabled: bool = True,
-        auto_anchor: bool = True
+        auto_anchor: bool = True,
+        batch_anchor: bool = False,
+        energy_backend: str = "codecarbon"
     ):
         """
         Initialize MRV tracker.
@@ -55,6 +80,11 @@ class MRVTracker:
             registry_url: URL of centralized registry API (optional)
             blockchain_enabled: Enable blockchain anchoring
             auto_anchor: Automatically anchor hash on blockchain after training
+            batch_anchor: Queue the hash for a shared batch transaction instead
+                (used when auto_anchor is False)
+            energy_backend: "codecarbon" (default) or "nvml" to sample GPU
+                power directly through NVML; falls back to CodeCarbon when
+                no GPU or NVML is available
         """
         self.experiment_name = experiment_name
         self.model_name = model_name or "Unknown"
@@ -67,19 +97,37 @@ class MRVTracker:
         self.registry_url = registry_url
         self.blockchain_enabled = blockchain_enabled
         self.auto_anchor = auto_anchor
+        self.batch_anchor = batch_anchor
+        self.energy_backend = energy_backend
         
         # Initialize components
         self.storage = MRVStorage(storage_dir=storage_dir)
+        if blockchain_enabled and not BLOCKCHAIN_AVAILABLE:
+            logger.warning(
+                "web3 not installed. Blockchain anchoring disabled "
+                "(pip install mrv-wrapper[blockchain])."
+            )
+            self.blockchain_enabled = blockchain_enabled = False
         self.blockchain = BlockchainConnector() if blockchain_enabled else None
         self.emissions_tracker = None
+        self.power_sampler = None
+        self._codecarbon_timer = None
+        self._energy_lock = threading.Lock()
+        self._pre_codecarbon_kwh = 0.0
+        self.measurement_tool = None
+        self.epoch_buffer = MRVBuffer()
         
         # State variables
         self.mrv_id = None
         self.tx_hash = None
+        self.receipt_future = None
         self.mrv_data = None
+        self._cached_hash = None
         self.start_time = None
         self.end_time = None
         self.emissions_data = None
+        self._epoch_mark = None
+        self._start_monotonic = None
     
     def __enter__(self):
         """Start tracking when entering context."""
@@ -93,43 +141,80 @@ class MRVTracker:
     
     def start(self):
         """Start emission tracking."""
-        print("🌱 Starting MRV tracking...")
+        logger.info("🌱 Starting MRV tracking...")
         
         self.start_time = get_current_timestamp()
+        self._start_monotonic = time.monotonic()
+        self._epoch_mark = self._start_monotonic
+        self.epoch_buffer.clear()
+        
+        self.power_sampler = None
+        if self.energy_backend == "nvml" and PowerSampler.is_supported():
+            # Sample GPU power directly, without CodeCarbon's polling thread
+            sampler = PowerSampler()
+            if sampler.start():
+                self.power_sampler = sampler
+                self.measurement_tool = "NVML"
         
-        # Start CodeCarbon tracker
-        self.emissions_tracker = EmissionsTracker(
-            project_name=self.experiment_name,
-            measure_power_secs=15,  # Measure every 15 seconds
-            save_to_file=False,  # We'll save to our own MRV format
-            logging_logger=None  # Suppress CodeCarbon logs
-        )
-        self.emissions_tracker.start()
+        if self.power_sampler is None:
+            if self.energy_backend == "nvml":
+                logger.warning("NVML not available. Falling back to CodeCarbon.")
+            
+            # Defer CodeCarbon so short runs skip its start-up cost entirely
+            self.emissions_tracker = None
+            self._pre_codecarbon_kwh = 0.0
+            if CODECARBON_AVAILABLE:
+                self._codecarbon_timer = threading.Timer(
+                    CODECARBON_START_DELAY, self._lazy_start_codecarbon
+                )
+                self._codecarbon_timer.daemon = True
+                self._codecarbon_timer.start()
+            else:
+                logger.warning(
+                    "CodeCarbon not installed. Estimating energy from TDP "
+                    "(pip install mrv-wrapper[energy])."
+                )
+            self.measurement_tool = "estimated_tdp"
         
-        print(f"📊 Tracking experiment: {self.experiment_name}")
+        logger.info("📊 Tracking experiment: %s", self.experiment_name)
     
     def stop(self):
         """Stop emission tracking and generate MRV record."""
-        if self.emissions_tracker is None:
-            print("⚠️  Warning: Tracker not started")
+        if self._start_monotonic is None:
+            logger.warning("Tracker not started")
             return
         
-        print("📊 Stopping MRV tracking...")
+        logger.info("📊 Stopping MRV tracking...")
         
-        # Stop emissions tracker
-        emissions = self.emissions_tracker.stop()
+        # Stop energy measurement
+        co2_kg = 0.0
+        if self.power_sampler is not None:
+            energy_kwh = self.power_sampler.stop()
+            if energy_kwh is None:
+                # Sampling broke down during the run
+                elapsed = time.monotonic() - self._start_monotonic
+                energy_kwh = estimate_tdp_watts() * elapsed / 3.6e6
+                self.measurement_tool = "estimated_tdp"
+        else:
+            if self._codecarbon_timer is not None:
+                self._codecarbon_timer.cancel()
+            with self._energy_lock:
+                self._codecarbon_timer = None
+                if self.emissions_tracker is not None:
+                    energy_kwh, co2_kg = self._stop_codecarbon()
+                else:
+                    # Run ended before CodeCarbon was started
+                    elapsed = time.monotonic() - self._start_monotonic
+                    energy_kwh = estimate_tdp_watts() * elapsed / 3.6e6
         self.end_time = get_current_timestamp()
         
         # Store emissions data
         self.emissions_data = {
-            "energy_kwh": round(emissions, 6) if emissions else 0.0,
-            "co2_kg": 0.0,  # CodeCarbon returns combined value
+            "energy_kwh": round(energy_kwh, 6),
+            "co2_kg": round(co2_kg, 6),
             "duration_seconds": self._calculate_duration()
         }
-        
-        # Note: CodeCarbon's stop() returns emissions in kWh
-        # For more accurate CO2, we'd need to access tracker.final_emissions_data
-        # For now, using simplified approach
+        self._start_monotonic = None
         
         # Generate MRV record
         self._generate_mrv_record()
@@ -141,27 +226,99 @@ class MRVTracker:
         if self.registry_url:
             save_to_registry(self.mrv_data, self.registry_url)
         
-        # Anchor hash on blockchain
+        # Anchor hash on blockchain; confirmation is awaited in the background
+        # and written to <mrv_id>.receipt.json
         if self.blockchain_enabled and self.auto_anchor and self.blockchain:
-            mrv_hash = compute_hash(self.mrv_data)
-            self.tx_hash = self.blockchain.anchor_hash(self.mrv_id, mrv_hash)
+            mrv_hash = self.get_hash()
+            self.tx_hash = self.blockchain.submit_hash(self.mrv_id, mrv_hash)
+            if self.tx_hash:
+                self.receipt_future = self.blockchain.await_receipt_async(
+                    self.mrv_id,
+                    self.tx_hash,
+                    callback=lambda receipt: self.storage.save_receipt(receipt["mrv_id"], receipt)
+                )
+        elif self.blockchain_enabled and self.batch_anchor and self.blockchain:
+            batch_anchor_queue.add(self.mrv_id, self.get_hash(), self.blockchain)
         
         # Print summary
         self._print_summary()
     
+    def _lazy_start_codecarbon(self):
+        """Start CodeCarbon once the run outlasts CODECARBON_START_DELAY."""
+        with self._energy_lock:
+            # stop() already ran
+            if self._codecarbon_timer is None:
+                return
+            
+            self.emissions_tracker = EmissionsTracker(
+                project_name=self.experiment_name,
+                measure_power_secs=15,  # Measure every 15 seconds
+                save_to_file=False,  # We'll save to our own MRV format
+                logging_logger=None  # Suppress CodeCarbon logs
+            )
+            self.emissions_tracker.start()
+            self.measurement_tool = "CodeCarbon"
+            
+            # CodeCarbon only measures from here on
+            elapsed = time.monotonic() - self._start_monotonic
+            self._pre_codecarbon_kwh = estimate_tdp_watts() * elapsed / 3.6e6
+    
+    def _stop_codecarbon(self):
+        """
+        Stop CodeCarbon and account for the window before it was started.
+        
+        Returns:
+            Tuple of (energy in kWh, CO₂ in kg) for the whole run
+        """
+        self.emissions_tracker.stop()
+        data = getattr(self.emissions_tracker, "final_emissions_data", None)
+        if data is None:
+            return self._pre_codecarbon_kwh, 0.0
+        
+        measured_kwh = data.energy_consumed or 0.0
+        energy_kwh = measured_kwh + self._pre_codecarbon_kwh
+        
+        # Apply the measured carbon intensity to the estimated window too
+        co2_kg = 0.0
+        if measured_kwh > 0:
+            co2_kg = (data.emissions or 0.0) * energy_kwh / measured_kwh
+        return energy_kwh, co2_kg
+    
+    def log_epoch(self, energy_kwh: Optional[float] = None):
+        """
+        Record per-epoch measurements; call once at the end of each epoch.
+        
+        The epoch's wall time is measured since start() or the previous
+        call. Logged epochs are stored in the MRV record under "epoch_log".
+        
+        Args:
+            energy_kwh: Energy consumed during the epoch in kWh (optional;
+                recorded as null when not given)
+        
+        Raises:
+            RuntimeError: If the tracker has not been started
+        """
+        if self._epoch_mark is None:
+            raise RuntimeError("log_epoch() called before start()")
+        
+        # Advance the mark by whole seconds only, so the fractional part
+        # carries into the next epoch and the epochs add up to the run
+        seconds = int(time.monotonic() - self._epoch_mark)
+        self.epoch_buffer.append(energy_kwh, seconds)
+        self._epoch_mark += seconds
+    
     def _calculate_duration(self) -> int:
         """Calculate training duration in seconds."""
-        if self.start_time and self.end_time:
-            from datetime import datetime
-            start = datetime.fromisoformat(self.start_time)
-            end = datetime.fromisoformat(self.end_time)
-            return int((end - start).total_seconds())
+        # Monotonic, so wall-clock adjustments during training don't skew it
+        if self._start_monotonic is not None:
+            return int(time.monotonic() - self._start_monotonic)
         return 0
     
     def _generate_mrv_record(self):
         """Generate MRV JSON record."""
         hardware_info = get_hardware_info()
         
+        self._cached_hash = None
         self.mrv_data = {
             "schema_version": "0.1",
             "mrv_id": self.storage.generate_mrv_id(),
@@ -182,7 +339,7 @@ class MRVTracker:
                 "ram_gb": hardware_info["ram_gb"]
             },
             "energy_emissions": {
-                "measurement_tool": "CodeCarbon",
+                "measurement_tool": self.measurement_tool,
                 "energy_kwh": self.emissions_data["energy_kwh"],
                 "co2_kg": self.emissions_data["co2_kg"],
                 "duration_seconds": self.emissions_data["duration_seconds"]
@@ -192,24 +349,36 @@ class MRVTracker:
                 "end_time": self.end_time
             }
         }
+        
+        # Only present when epochs were logged, so other records are unchanged
+        if self.epoch_buffer:
+            self.mrv_data["epoch_log"] = self.epoch_buffer.to_dict()
     
     def _print_summary(self):
-        """Print tracking summary."""
-        print("\n" + "="*60)
-        print("🌱 MRV TRACKING SUMMARY")
-        print("="*60)
-        print(f"Experiment:     {self.experiment_name}")
-        print(f"Model:          {self.model_name}")
-        print(f"Dataset:        {self.dataset_name}")
-        print(f"Duration:       {format_duration(self.emissions_data['duration_seconds'])}")
-        print(f"Energy:         {self.emissions_data['energy_kwh']:.6f} kWh")
-        print(f"CO₂:            {self.emissions_data['co2_kg']:.6f} kg")
-        print(f"\nMRV ID:         {self.mrv_id}")
+        """Log tracking summary."""
+        # Skip formatting entirely when INFO output is disabled
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        lines = [
+            "",
+            "="*60,
+            "🌱 MRV TRACKING SUMMARY",
+            "="*60,
+            f"Experiment:     {self.experiment_name}",
+            f"Model:          {self.model_name}",
+            f"Dataset:        {self.dataset_name}",
+            f"Duration:       {format_duration(self.emissions_data['duration_seconds'])}",
+            f"Energy:         {self.emissions_data['energy_kwh']:.6f} kWh",
+            f"CO₂:            {self.emissions_data['co2_kg']:.6f} kg",
+            f"\nMRV ID:         {self.mrv_id}"
+        ]
         
         if self.tx_hash:
-            print(f"Blockchain TX:  {self.tx_hash[:10]}...{self.tx_hash[-6:]}")
+            lines.append(f"Blockchain TX:  {self.tx_hash[:10]}...{self.tx_hash[-6:]}")
         
-        print("="*60 + "\n")
+        lines.append("="*60 + "\n")
+        logger.info("\n".join(lines))
     
     def get_mrv_data(self) -> Optional[Dict[str, Any]]:
         """
@@ -227,9 +396,13 @@ class MRVTracker:
         Returns:
             Hash string or None if data not yet generated
         """
-        if self.mrv_data:
-            return compute_hash(self.mrv_data)
-        return None
+        if not self.mrv_data:
+            return None
+        
+        # Computed once per generated record; reset by _generate_mrv_record
+        if self._cached_hash is None:
+            self._cached_hash = compute_hash(self.mrv_data)
+        return self._cached_hash
     
     def verify_on_blockchain(self) -> bool:
         """
@@ -241,5 +414,10 @@ class MRVTracker:
         if not self.blockchain or not self.mrv_data or not self.mrv_id:
             return False
         
-        expected_hash = compute_hash(self.mrv_data)
-        return self.blockchain.verify_hash(self.mrv_id, expected_hash)
+        # Make sure a pending anchoring transaction has been mined
+        if self.receipt_future is not None:
+            self.receipt_future.result()
+        
+        # Always re-hash here so in-place edits to mrv_data are detected
+        self._cached_hash = compute_hash(self.mrv_data)
+        return self.blockchain.verify_hash(self.mrv_id, self._cached_hash)
@@ -2,18 +2,277 @@
 Utility functions for MRV wrapper.
 """
 
+import functools
 import hashlib
 import json
+import logging
+import math
+import os
 import platform
+import textwrap
 import psutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from json.encoder import encode_basestring_ascii
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+# GPUtil module, imported on first GPU probe (None: not tried yet, False:
+# not installed); importing it pulls in distutils and takes ~200 ms
+_GPUTIL = None
+
+try:
+    import pynvml
+    PYNVML_AVAILABLE = True
+except ImportError:
+    PYNVML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 try:
-    import GPUtil
-    GPU_AVAILABLE = True
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
 except ImportError:
-    GPU_AVAILABLE = False
+    FASTJSONSCHEMA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Prefer OpenSSL's SHA-256, which uses SHA-NI/AVX2 code where the CPU
+# supports it; CPython's builtin fallback is several times slower
+try:
+    from _hashlib import openssl_sha256 as _sha256
+    OPENSSL_SHA256_AVAILABLE = True
+except ImportError:
+    _sha256 = hashlib.sha256
+    OPENSSL_SHA256_AVAILABLE = False
+    logger.warning(
+        "Python is not using OpenSSL for SHA-256; MRV hashing "
+        "will be slower. Use a Python build linked against OpenSSL 1.1.1+."
+    )
+
+# JSON Schema of MRV records, shipped with the package
+SCHEMA_PATH = Path(__file__).with_name("schema.json")
+
+
+# Leaf types both encoders write the same way (subclasses excluded)
+_PLAIN_JSON_SCALARS = frozenset((str, int, bool, type(None)))
+
+
+def _is_plain_json(data: Any, canonical: bool = False) -> bool:
+    """
+    Check that data holds only built-in JSON types and finite floats.
+    
+    orjson also serializes UUID, Enum, datetime, dataclasses and builtin
+    subclasses that json.dumps rejects or writes differently, and turns
+    NaN/Infinity into null, so such data must not reach it.
+    
+    Args:
+        data: Data to check
+        canonical: Also require every non-zero float to lie in
+            [1e-4, 1e16), where orjson writes the same digits as
+            json.dumps; outside it json.dumps switches to exponent form
+            ("1e-05", "1e+16") and orjson does not match
+        
+    Returns:
+        True if orjson can encode data in place of json.dumps
+    """
+    scalars = _PLAIN_JSON_SCALARS
+    isfinite = math.isfinite
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        obj_type = type(obj)
+        if obj_type is dict:
+            for key in obj:
+                if type(key) is not str:
+                    return False
+            values = obj.values()
+        elif obj_type is list or obj_type is tuple:
+            values = obj
+        else:
+            values = (obj,)
+        
+        for value in values:
+            value_type = type(value)
+            if value_type in scalars:
+                continue
+            if value_type is float:
+                if not isfinite(value):
+                    return False
+                if canonical and value and not 1e-4 <= abs(value) < 1e16:
+                    return False
+            elif value_type is dict or value_type is list or value_type is tuple:
+                stack.append(value)
+            else:
+                return False
+    return True
+
+
+def _orjson_dumps(
+    data: Any,
+    indent: bool = False,
+    canonical: bool = False
+) -> Optional[bytes]:
+    """
+    Serialize with orjson using sorted keys, only for data that json.dumps
+    accepts and encodes to the same values.
+    
+    Args:
+        data: Data to serialize
+        indent: Indent with two spaces instead of compact output
+        canonical: Only accept floats orjson writes byte-identically to
+            json.dumps (see _is_plain_json)
+        
+    Returns:
+        JSON bytes, or None if orjson is unavailable or the data must go
+        through json.dumps
+    """
+    if not ORJSON_AVAILABLE or not _is_plain_json(data, canonical):
+        return None
+    
+    option = orjson.OPT_INDENT_2 if indent else 0
+    try:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS | option)
+    except TypeError:
+        # e.g. integers beyond 64 bits
+        return None
+
+
+# Field layout of records produced by MRVTracker (None marks a leaf value)
+_MRV_RECORD_FIELDS = {
+    "schema_version": None,
+    "mrv_id": None,
+    "experiment": {"experiment_name": None, "model_name": None, "dataset_name": None},
+    "training": {"epochs": None, "batch_size": None, "framework": None},
+    "hardware": {"gpu_type": None, "num_gpus": None, "cpu_type": None, "ram_gb": None},
+    "energy_emissions": {
+        "measurement_tool": None,
+        "energy_kwh": None,
+        "co2_kg": None,
+        "duration_seconds": None
+    },
+    "timestamps": {"start_time": None, "end_time": None}
+}
+
+
+def _encode_value(value: Any) -> str:
+    """Encode a single value exactly as json.dumps does."""
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    if value_type is int:
+        return int.__repr__(value)
+    if value_type is float:
+        if value != value:
+            return 'NaN'
+        if value == math.inf:
+            return 'Infinity'
+        if value == -math.inf:
+            return '-Infinity'
+        return float.__repr__(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def _build_encoder(fields: Dict[str, Any]):
+    """
+    Generate a canonical JSON encoder specialized for one record layout.
+    
+    Keys are sorted and written into a single format string when the
+    encoder is built, so encoding a record only checks its key sets and
+    encodes the leaf values.
+    
+    Args:
+        fields: Nested field layout; None marks a leaf value
+        
+    Returns:
+        Function returning canonical JSON bytes, or None if the record
+        does not have exactly this layout
+    """
+    lines, leaves = [], []
+    namespace = {"_dict": dict, "_v": _encode_value}
+    
+    def emit(layout: Dict[str, Any], expr: str) -> str:
+        keys_name = f"_keys{len(namespace)}"
+        namespace[keys_name] = frozenset(layout)
+        lines.append(f"if type({expr}) is not _dict or {expr}.keys() != {keys_name}:")
+        lines.append("    return None")
+        
+        parts = []
+        for key in sorted(layout):
+            prefix = json.dumps(key).replace('%', '%%') + ':'
+            if layout[key] is None:
+                leaves.append(f"_v({expr}[{key!r}]),")
+                parts.append(prefix + '%s')
+            else:
+                local = f"d{len(lines)}"
+                lines.append(f"{local} = {expr}[{key!r}]")
+                parts.append(prefix + emit(layout[key], local))
+        return '{' + ','.join(parts) + '}'
+    
+    template = emit(fields, "d")
+    lines.append(f"return ({template!r} % (")
+    lines.extend("    " + leaf for leaf in leaves)
+    lines.append(")).encode('ascii')")
+    
+    source = "def encode(d):\n" + textwrap.indent("\n".join(lines), "    ")
+    exec(source, namespace)
+    return namespace["encode"]
+
+
+_encode_mrv_record = _build_encoder(_MRV_RECORD_FIELDS)
+
+
+def canonical_json(data: Dict[str, Any]) -> bytes:
+    """
+    Serialize MRV data to the canonical bytes used for hashing.
+    
+    The canonical form is ``json.dumps(data, sort_keys=True,
+    separators=(',', ':'))`` encoded as UTF-8, which is plain ASCII because
+    non-ASCII characters are escaped. Records with exactly the layout
+    MRVTracker produces go through an encoder generated for that layout.
+    Other data is tried with orjson, whose output is only accepted if it is
+    guaranteed to be byte-identical, so hashes never depend on which
+    encoder ran.
+    
+    Args:
+        data: MRV JSON dictionary
+        
+    Returns:
+        Canonical JSON bytes
+    """
+    buf = _encode_mrv_record(data)
+    if buf is not None:
+        return buf
+    
+    buf = _orjson_dumps(data, canonical=True)
+    
+    # Non-ASCII text and DEL are escaped by json.dumps
+    if (
+        buf is not None
+        and buf[:1] in (b"{", b"[")
+        and buf.isascii()
+        and b"\x7f" not in buf
+    ):
+        return buf
+    
+    # ensure_ascii output is pure ASCII, so the ASCII codec gives the same
+    # bytes as UTF-8 with a straight copy
+    return json.dumps(
+        data,
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=True
+    ).encode('ascii')
 
 
 def compute_hash(data: Dict[str, Any]) -> str:
@@ -26,9 +285,111 @@ def compute_hash(data: Dict[str, Any]) -> str:
     Returns:
         Hexadecimal hash string
     """
-    # Ensure deterministic JSON serialization
-    json_str = json.dumps(data, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+    return _sha256(canonical_json(data)).hexdigest()
+
+
+def compute_hash_bytes(buf: bytes) -> str:
+    """
+    Compute SHA-256 hash of an already serialized MRV record.
+    
+    Args:
+        buf: Canonical JSON bytes, as returned by canonical_json
+        
+    Returns:
+        Hexadecimal hash string
+    """
+    return _sha256(buf).hexdigest()
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """
+    Compute the Merkle root of serialized MRV records.
+    
+    Leaves are hashed as SHA-256(0x00 || leaf) and inner nodes as
+    SHA-256(0x01 || left || right), so a leaf can never be passed off as
+    an inner node. An unpaired node at the end of a level is carried up
+    unchanged.
+    
+    Args:
+        leaves: Canonical JSON bytes of each record, in order
+        
+    Returns:
+        32-byte root digest (SHA-256 of empty input if leaves is empty)
+    """
+    sha256 = _sha256
+    if not leaves:
+        return sha256(b"").digest()
+    
+    level = [sha256(b"\x00" + leaf).digest() for leaf in leaves]
+    while len(level) > 1:
+        paired = [
+            sha256(b"\x01" + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    
+    return level[0]
+
+
+def compute_hashes(records: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    Compute SHA-256 hashes of many MRV records.
+    
+    Equivalent to calling compute_hash on each record, without the
+    per-record call overhead.
+    
+    Args:
+        records: MRV JSON dictionaries
+        
+    Returns:
+        Hexadecimal hash strings, in input order
+    """
+    sha256 = _sha256
+    encode = canonical_json
+    return [sha256(encode(record)).hexdigest() for record in records]
+
+
+def _hash_buffers(buffers: List[bytes]) -> List[str]:
+    """Hash pre-serialized records."""
+    sha256 = _sha256
+    return [sha256(buf).hexdigest() for buf in buffers]
+
+
+def compute_hashes_parallel(
+    records: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None
+) -> List[str]:
+    """
+    Compute SHA-256 hashes of many MRV records on several threads.
+    
+    Records are serialized on the calling thread (JSON encoding holds the
+    GIL), then the buffers are split into one contiguous slice per worker
+    and hashed concurrently. hashlib releases the GIL only for inputs of
+    2 KiB or more, so this pays off for large records, e.g. with long
+    epoch logs; for typical ~1 KB records compute_hashes is as fast.
+    
+    Args:
+        records: MRV JSON dictionaries
+        workers: Number of threads (default: CPU count)
+        
+    Returns:
+        Hexadecimal hash strings, in input order
+    """
+    encode = canonical_json
+    buffers = [encode(record) for record in records]
+    
+    workers = min(workers or os.cpu_count() or 1, len(buffers))
+    if workers <= 1:
+        return _hash_buffers(buffers)
+    
+    size = -(-len(buffers) // workers)
+    slices = [buffers[i:i + size] for i in range(0, len(buffers), size)]
+    
+    with ThreadPoolExecutor(max_workers=len(slices)) as executor:
+        results = executor.map(_hash_buffers, slices)
+        return [digest for chunk in results for digest in chunk]
 
 
 def get_current_timestamp() -> str:
@@ -41,77 +402,149 @@ def get_current_timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def get_cpu_info() -> Dict[str, Any]:
+def _detect_cpu_type() -> str:
     """
-    Get CPU information.
+    Detect the CPU model name.
+    
+    platform.processor() is empty on most Linux systems, so the brand
+    string is read from /proc/cpuinfo there.
     
     Returns:
-        Dictionary with CPU type and core count
+        CPU model name or "Unknown"
     """
+    try:
+        with open("/proc/cpuinfo", 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    
+    return platform.processor() or "Unknown"
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_cpu_info() -> Dict[str, Any]:
+    """Probe CPU information once; callers get copies of the result."""
     return {
-        "cpu_type": platform.processor() or "Unknown",
+        "cpu_type": _detect_cpu_type(),
         "cpu_cores": psutil.cpu_count(logical=False),
         "cpu_threads": psutil.cpu_count(logical=True)
     }
 
 
-def get_gpu_info() -> Dict[str, Any]:
+def get_cpu_info() -> Dict[str, Any]:
     """
-    Get GPU information.
+    Get CPU information (cached; see refresh_hardware_info).
     
     Returns:
-        Dictionary with GPU type and count
+        Dictionary with CPU type and core count
     """
-    if not GPU_AVAILABLE:
-        return {
-            "gpu_type": "None",
-            "num_gpus": 0,
-            "gpu_memory_gb": 0
-        }
+    return dict(_probe_cpu_info())
+
+
+def _get_gpu_info_nvml() -> Optional[Dict[str, Any]]:
+    """
+    Query GPUs through the NVML library.
+    
+    Returns:
+        Dictionary with GPU type and count, or None if NVML is unusable
+    """
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return None
     
     try:
-        gpus = GPUtil.getGPUs()
-        if not gpus:
-            return {
-                "gpu_type": "None",
-                "num_gpus": 0,
-                "gpu_memory_gb": 0
-            }
+        count = pynvml.nvmlDeviceGetCount()
+        if count == 0:
+            return {"gpu_type": "None", "num_gpus": 0, "gpu_memory_gb": 0}
         
         # Use first GPU for info
-        gpu = gpus[0]
+        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+        name = pynvml.nvmlDeviceGetName(handle)
+        if isinstance(name, bytes):  # nvidia-ml-py < 11.515
+            name = name.decode()
+        memory = pynvml.nvmlDeviceGetMemoryInfo(handle).total
         return {
-            "gpu_type": gpu.name,
-            "num_gpus": len(gpus),
-            "gpu_memory_gb": round(gpu.memoryTotal / 1024, 2)
-        }
-    except Exception:
-        return {
-            "gpu_type": "Unknown",
-            "num_gpus": 0,
-            "gpu_memory_gb": 0
+            "gpu_type": name,
+            "num_gpus": count,
+            "gpu_memory_gb": round(memory / 1024**3, 2)
         }
+    except pynvml.NVMLError:
+        return None
+    finally:
+        pynvml.nvmlShutdown()
 
 
-def get_ram_info() -> int:
+@functools.lru_cache(maxsize=1)
+def _probe_gpu_info() -> Dict[str, Any]:
     """
-    Get total RAM in GB.
+    Probe GPU information once; callers get copies of the result.
+    
+    Queries NVML directly when pynvml is installed and falls back to
+    GPUtil, which runs nvidia-smi in a subprocess.
+    """
+    info = _get_gpu_info_nvml() if PYNVML_AVAILABLE else None
+    if info is not None:
+        return info
+    
+    info = {
+        "gpu_type": "None",
+        "num_gpus": 0,
+        "gpu_memory_gb": 0
+    }
+    
+    global _GPUTIL
+    if _GPUTIL is None:
+        try:
+            import GPUtil as _GPUTIL
+        except ImportError:
+            _GPUTIL = False
+    
+    if _GPUTIL:
+        try:
+            gpus = _GPUTIL.getGPUs()
+            if gpus:
+                # Use first GPU for info
+                gpu = gpus[0]
+                info = {
+                    "gpu_type": gpu.name,
+                    "num_gpus": len(gpus),
+                    "gpu_memory_gb": round(gpu.memoryTotal / 1024, 2)
+                }
+        except Exception:
+            info["gpu_type"] = "Unknown"
+    
+    return info
+
+
+def get_gpu_info() -> Dict[str, Any]:
+    """
+    Get GPU information (cached; see refresh_hardware_info).
     
     Returns:
-        Total RAM in GB (rounded)
+        Dictionary with GPU type and count
     """
-    return round(psutil.virtual_memory().total / (1024**3))
+    return dict(_probe_gpu_info())
 
 
-def get_hardware_info() -> Dict[str, Any]:
+@functools.lru_cache(maxsize=1)
+def get_ram_info() -> int:
     """
-    Collect all hardware information.
+    Get total RAM in GB (cached; see refresh_hardware_info).
     
     Returns:
-        Dictionary with CPU, GPU, and RAM information
+        Total RAM in GB (rounded)
     """
-    cpu_info = get_cpu_info()
-    gpu_info = get_gpu_info()
+    return round(psutil.virtual_memory().total / (1024**3))
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_hardware_info() -> Dict[str, Any]:
+    """Combine the cached CPU, GPU and RAM probes."""
+    cpu_info = _probe_cpu_info()
+    gpu_info = _probe_gpu_info()
     
     return {
         "cpu_type": cpu_info["cpu_type"],
@@ -123,30 +556,77 @@ def get_hardware_info() -> Dict[str, Any]:
     }
 
 
+def get_hardware_info() -> Dict[str, Any]:
+    """
+    Collect all hardware information.
+    
+    The host is probed once per process and the result is cached; each
+    call returns a fresh copy, so callers may modify it. Call
+    refresh_hardware_info() to re-probe, e.g. after GPUs were added or
+    removed while the process is running.
+    
+    Returns:
+        Dictionary with CPU, GPU, and RAM information
+    """
+    return dict(_probe_hardware_info())
+
+
+def refresh_hardware_info() -> Dict[str, Any]:
+    """
+    Discard cached hardware information and probe the host again.
+    
+    Returns:
+        Dictionary with CPU, GPU, and RAM information
+    """
+    _probe_cpu_info.cache_clear()
+    _probe_gpu_info.cache_clear()
+    get_ram_info.cache_clear()
+    _probe_hardware_info.cache_clear()
+    return get_hardware_info()
+
+
+# Top-level fields every MRV record must contain
+_REQUIRED_TOP = frozenset((
+    "schema_version",
+    "mrv_id",
+    "experiment",
+    "training",
+    "hardware",
+    "energy_emissions",
+    "timestamps"
+))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_schema_validator():
+    """Compile the MRV JSON Schema into a validation function on first use."""
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        return fastjsonschema.compile(json.load(f))
+
+
 def validate_mrv_json(data: Dict[str, Any]) -> bool:
     """
     Validate MRV JSON schema.
     
+    Uses the fastjsonschema-compiled validator for schema.json when
+    fastjsonschema is installed, otherwise checks the required fields.
+    
     Args:
         data: MRV JSON dictionary
         
     Returns:
         True if valid, False otherwise
     """
-    required_fields = [
-        "schema_version",
-        "mrv_id",
-        "experiment",
-        "training",
-        "hardware",
-        "energy_emissions",
-        "timestamps"
-    ]
+    if FASTJSONSCHEMA_AVAILABLE:
+        try:
+            _get_schema_validator()(data)
+        except fastjsonschema.JsonSchemaValueException:
+            return False
+        return True
     
     # Check top-level fields
-    for field in required_fields:
-        if field not in data:
-            return False
+    if not _REQUIRED_TOP.issubset(data):
+        return False
     
     # Check nested fields
     if "experiment_name" not in data["experiment"]:
@@ -159,6 +639,49 @@ def validate_mrv_json(data: Dict[str, Any]) -> bool:
     return True
 
 
+def validate_mrv_batch(records: Iterable[Dict[str, Any]]) -> List[bool]:
+    """
+    Validate many MRV records.
+    
+    Equivalent to calling validate_mrv_json on each record, sharing one
+    compiled schema validator.
+    
+    Args:
+        records: MRV JSON dictionaries
+        
+    Returns:
+        True/False per record, in input order
+    """
+    if not FASTJSONSCHEMA_AVAILABLE:
+        return [validate_mrv_json(record) for record in records]
+    
+    validate = _get_schema_validator()
+    error = fastjsonschema.JsonSchemaValueException
+    results = []
+    for record in records:
+        try:
+            validate(record)
+        except error:
+            results.append(False)
+        else:
+            results.append(True)
+    return results
+
+
+# format_duration templates indexed by hours/minutes/seconds presence bits;
+# seconds are always shown when nothing else is
+_DURATION_TEMPLATES = (
+    "{2}s",
+    "{2}s",
+    "{1}m",
+    "{1}m {2}s",
+    "{0}h",
+    "{0}h {2}s",
+    "{0}h {1}m",
+    "{0}h {1}m {2}s"
+)
+
+
 def format_duration(seconds: float) -> str:
     """
     Format duration in human-readable format.
@@ -173,12 +696,6 @@ def format_duration(seconds: float) -> str:
     minutes = int((seconds % 3600) // 60)
     secs = int(seconds % 60)
     
-    parts = []
-    if hours > 0:
-        parts.append(f"{hours}h")
-    if minutes > 0:
-        parts.append(f"{minutes}m")
-    if secs > 0 or not parts:
-        parts.append(f"{secs}s")
-    
-    return " ".join(parts)
+    # Template selected by which of hours/minutes/seconds are non-zero
+    mask = (hours > 0) << 2 | (minutes > 0) << 1 | (secs > 0)
+    return _DURATION_TEMPLATES[mask].format(hours, minutes, secs)
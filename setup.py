@@ -13,6 +13,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/argha5/Blockchain-Assisted-MRV",
     packages=find_packages(),
+    package_data={"mrv_wrapper": ["schema.json"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Science/Research",
@@ -26,14 +27,28 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[
-        "codecarbon>=2.3.0",
-        "web3>=6.0.0",
         "psutil>=5.9.0",
-        "GPUtil>=1.4.0",
         "python-dotenv>=1.0.0",
-        "requests>=2.31.0",
+        "orjson>=3.8.0",
+        "fastjsonschema>=2.16.0",
     ],
     extras_require={
+        "energy": [
+            "codecarbon>=2.3.0",
+        ],
+        "blockchain": [
+            "web3>=6.0.0",
+            "requests>=2.31.0",
+        ],
+        "gpu": [
+            "GPUtil>=1.4.0",
+        ],
+        "all": [
+            "codecarbon>=2.3.0",
+            "web3>=6.0.0",
+            "requests>=2.31.0",
+            "GPUtil>=1.4.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "black>=23.0.0",
@@ -44,5 +59,9 @@ setup(
             "flask-cors>=4.0.0",
             "sqlalchemy>=2.0.0",
         ],
+        "nvml": [
+            "nvidia-ml-py>=12.0.0",
+            "numpy>=1.21.0",
+        ],
     },
 )
@@ -54,6 +54,40 @@ describe("MRVRegistry", function () {
         });
     });
 
+    describe("Batch Registration", function () {
+        it("Should register several MRV records in one transaction", async function () {
+            const mrvIds = ["MRV-batch-001", "MRV-batch-002"];
+            const hashes = mrvIds.map(id => ethers.keccak256(ethers.toUtf8Bytes(id)));
+
+            await expect(mrvRegistry.registerMRVBatch(mrvIds, hashes))
+                .to.emit(mrvRegistry, "MRVRegistered");
+
+            for (let i = 0; i < mrvIds.length; i++) {
+                expect(await mrvRegistry.verifyMRVHash(mrvIds[i], hashes[i])).to.be.true;
+            }
+        });
+
+        it("Should reject mismatched array lengths", async function () {
+            const hash = ethers.keccak256(ethers.toUtf8Bytes("test data"));
+
+            await expect(
+                mrvRegistry.registerMRVBatch(["MRV-batch-003", "MRV-batch-004"], [hash])
+            ).to.be.revertedWith("Length mismatch");
+        });
+
+        it("Should revert the whole batch on a duplicate MRV ID", async function () {
+            const hash = ethers.keccak256(ethers.toUtf8Bytes("test data"));
+
+            await mrvRegistry.registerMRV("MRV-batch-005", hash);
+
+            await expect(
+                mrvRegistry.registerMRVBatch(["MRV-batch-006", "MRV-batch-005"], [hash, hash])
+            ).to.be.revertedWith("MRV ID already registered");
+
+            expect(await mrvRegistry.isMRVRegistered("MRV-batch-006")).to.be.false;
+        });
+    });
+
     describe("Retrieval", function () {
         it("Should retrieve MRV hash correctly", async function () {
             const mrvId = "MRV-test-004";
@@ -0,0 +1,109 @@
+"""
+Tests for BatchAnchorQueue retry and confirmation handling.
+"""
+
+import atexit
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("web3")
+
+from mrv_wrapper.blockchain import BatchAnchorQueue
+
+
+class FakeConnector:
+    """Connector that records batches and returns scripted results."""
+    
+    def __init__(self, send_ok=True, status="confirmed"):
+        self.send_ok = send_ok
+        self.status = status
+        self.sent = []
+    
+    def submit_batch(self, pairs):
+        self.sent.append(list(pairs))
+        if not self.send_ok:
+            return None
+        return f"0x{len(self.sent):064x}"
+    
+    def await_receipt_async(self, mrv_id, tx_hash, callback=None):
+        receipt = {"mrv_id": mrv_id, "tx_hash": tx_hash, "status": self.status}
+        if callback is not None:
+            callback(receipt)
+        future = Future()
+        future.set_result(receipt)
+        return future
+
+
+def make_queue(max_size=3, retry_delay=60.0):
+    queue = BatchAnchorQueue(max_size=max_size, retry_delay=retry_delay)
+    # Tests must not flush at interpreter exit
+    atexit.unregister(queue.flush)
+    return queue
+
+
+def add_records(queue, connector, start, count):
+    for i in range(start, start + count):
+        queue.add(f"MRV-{i}", f"{i:064x}", connector)
+
+
+def test_full_queue_is_sent_and_confirmed():
+    queue = make_queue()
+    connector = FakeConnector()
+    
+    add_records(queue, connector, 0, 3)
+    
+    assert len(connector.sent) == 1
+    assert [mrv_id for mrv_id, _ in connector.sent[0]] == ["MRV-0", "MRV-1", "MRV-2"]
+    assert len(queue) == 0
+    assert queue.receipt_future.result()["status"] == "confirmed"
+    assert queue.failed == []
+
+
+def test_send_failure_requeues_without_resending_on_every_add():
+    queue = make_queue()
+    connector = FakeConnector(send_ok=False)
+    
+    add_records(queue, connector, 0, 6)
+    
+    # One attempt when the queue filled up; later adds wait for retry_delay
+    assert len(connector.sent) == 1
+    assert len(queue) == 6
+    
+    # An explicit flush retries everything, in the original order
+    connector.send_ok = True
+    assert queue.flush() is not None
+    assert [mrv_id for mrv_id, _ in connector.sent[-1]] == [f"MRV-{i}" for i in range(6)]
+    assert len(queue) == 0
+
+
+def test_full_queue_retries_after_retry_delay():
+    queue = make_queue(retry_delay=0.0)
+    connector = FakeConnector(send_ok=False)
+    
+    add_records(queue, connector, 0, 3)
+    connector.send_ok = True
+    add_records(queue, connector, 3, 1)
+    
+    assert len(connector.sent) == 2
+    assert len(connector.sent[-1]) == 4
+    assert len(queue) == 0
+
+
+@pytest.mark.parametrize("status", ["failed", "error"])
+def test_reverted_batch_is_dropped_and_recorded(status):
+    queue = make_queue()
+    connector = FakeConnector(status=status)
+    
+    add_records(queue, connector, 0, 3)
+    add_records(queue, connector, 3, 2)
+    
+    # Not re-queued: later adds do not send the reverted pairs again
+    assert len(connector.sent) == 1
+    assert len(queue) == 2
+    assert [mrv_id for mrv_id, _ in queue.failed] == ["MRV-0", "MRV-1", "MRV-2"]
+
+
+def test_flush_of_empty_queue_sends_nothing():
+    queue = make_queue()
+    assert queue.flush() is None
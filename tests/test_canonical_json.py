@@ -0,0 +1,244 @@
+"""
+Regression tests for the canonical JSON form that MRV hashes are computed over.
+
+Every encoder path in canonical_json must produce exactly the bytes of
+json.dumps(sort_keys=True, separators=(',', ':')); any difference would
+change the hash of records already anchored on chain.
+"""
+
+import enum
+import json
+import math
+import random
+import struct
+import uuid
+
+import pytest
+
+from mrv_wrapper.utils import (
+    ORJSON_AVAILABLE,
+    _encode_mrv_record,
+    _orjson_dumps,
+    canonical_json,
+    compute_hash
+)
+
+
+class Precision(enum.IntEnum):
+    FP16 = 16
+    FP32 = 32
+
+
+class Framework(enum.Enum):
+    TORCH = "PyTorch"
+
+
+def reference(data):
+    """Canonical bytes as defined by the standard library."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def tracker_record(**overrides):
+    """Build a record with the exact layout MRVTracker produces."""
+    record = {
+        "schema_version": "0.1",
+        "mrv_id": "MRV-5b0c6f0e-8a57-4b39-9d0e-3f1c2a7e9b41",
+        "experiment": {
+            "experiment_name": "resnet18_cifar10",
+            "model_name": "ResNet18",
+            "dataset_name": "CIFAR-10"
+        },
+        "training": {"epochs": 10, "batch_size": 128, "framework": "PyTorch"},
+        "hardware": {
+            "gpu_type": "NVIDIA A100-SXM4-40GB",
+            "num_gpus": 1,
+            "cpu_type": "AMD EPYC 7742 64-Core Processor",
+            "ram_gb": 256
+        },
+        "energy_emissions": {
+            "measurement_tool": "CodeCarbon",
+            "energy_kwh": 0.123456,
+            "co2_kg": 0.048765,
+            "duration_seconds": 3600
+        },
+        "timestamps": {
+            "start_time": "2024-01-01T00:00:00+00:00",
+            "end_time": "2024-01-01T01:00:00+00:00"
+        }
+    }
+    for path, value in overrides.items():
+        section, _, key = path.partition("__")
+        if key:
+            record[section][key] = value
+        else:
+            record[section] = value
+    return record
+
+
+# Values that json.dumps writes in a non-obvious way
+TRICKY_LEAVES = [
+    None,
+    True,
+    False,
+    0,
+    -1,
+    2**64 + 1,
+    0.0,
+    -0.0,
+    1e-4,
+    9.9e-5,
+    1e-7,
+    1e16,
+    1.5e300,
+    5e-324,
+    123456789.123456789,
+    float("nan"),
+    float("inf"),
+    float("-inf"),
+    Precision.FP16,
+    "",
+    "ASCII only",
+    "Ünïcödé 中文 \U0001f331",
+    'quote " backslash \\ slash /',
+    "control \x00\x1f\n\t and DEL \x7f",
+    "%s %d %% format specifiers",
+]
+
+
+@pytest.mark.parametrize("value", TRICKY_LEAVES, ids=repr)
+def test_generated_encoder_matches_json_dumps(value):
+    for path in ("experiment__model_name", "training__epochs", "energy_emissions__energy_kwh"):
+        record = tracker_record(**{path: value})
+        
+        # The record keeps the tracker layout, so the generated encoder is used
+        assert _encode_mrv_record(record) is not None
+        assert canonical_json(record) == reference(record)
+
+
+def test_generated_encoder_rejects_other_layouts():
+    extra_top = tracker_record()
+    extra_top["epoch_log"] = {"energy_kwh": [0.1, None], "duration_seconds": [60, 61]}
+    
+    extra_nested = tracker_record()
+    extra_nested["hardware"]["gpu_memory_gb"] = 40.0
+    
+    missing = tracker_record()
+    del missing["training"]["framework"]
+    
+    not_a_dict = tracker_record(training=[10, 128, "PyTorch"])
+    
+    for record in (extra_top, extra_nested, missing, not_a_dict):
+        assert _encode_mrv_record(record) is None
+        assert canonical_json(record) == reference(record)
+
+
+@pytest.mark.parametrize("value", TRICKY_LEAVES, ids=repr)
+def test_records_with_extra_keys_match_json_dumps(value):
+    record = tracker_record()
+    record["epoch_log"] = {"energy_kwh": [value, 0.25], "duration_seconds": [60, 61]}
+    record["notes"] = {"value": value, "nested": [value, {"key": value}]}
+    
+    assert canonical_json(record) == reference(record)
+
+
+def test_key_order_and_non_ascii_keys():
+    data = {"b": 1, "a": {"é": 1, "z": 2, "A": 3, "\x7f": 4, "中": 5}, "": None}
+    assert canonical_json(data) == reference(data)
+
+
+def test_hash_does_not_depend_on_input_key_order():
+    record = tracker_record()
+    reordered = {key: record[key] for key in reversed(list(record))}
+    reordered["hardware"] = dict(reversed(list(record["hardware"].items())))
+    
+    assert compute_hash(reordered) == compute_hash(record)
+
+
+def test_types_json_dumps_rejects_are_rejected():
+    for value in (uuid.uuid4(), Framework.TORCH):
+        with pytest.raises(TypeError):
+            canonical_json({"value": value})
+        with pytest.raises(TypeError):
+            canonical_json(tracker_record(experiment__model_name=value))
+
+
+def test_random_records_match_json_dumps():
+    rng = random.Random(20240101)
+    
+    def random_float():
+        kind = rng.random()
+        if kind < 0.4:
+            # Arbitrary bit patterns cover every exponent
+            value = struct.unpack('<d', rng.getrandbits(64).to_bytes(8, 'little'))[0]
+            return value if math.isfinite(value) else 0.5
+        if kind < 0.7:
+            return rng.uniform(-1e6, 1e6)
+        return 10 ** rng.uniform(-12, 20)
+    
+    for _ in range(2000):
+        record = tracker_record(
+            energy_emissions__energy_kwh=random_float(),
+            energy_emissions__co2_kg=random_float()
+        )
+        assert canonical_json(record) == reference(record)
+        
+        record["epoch_log"] = {
+            "energy_kwh": [random_float() for _ in range(5)],
+            "duration_seconds": [rng.randint(0, 10**6) for _ in range(5)]
+        }
+        assert canonical_json(record) == reference(record)
+
+
+@pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+class TestOrjsonGuard:
+    """
+    The orjson path must either produce json.dumps bytes or refuse the data.
+    
+    These tests pin the orjson output that canonical_json accepts, so an
+    orjson upgrade that changes number or string formatting fails here
+    instead of silently changing hashes.
+    """
+    
+    def test_accepted_output_matches_json_dumps(self):
+        rng = random.Random(7)
+        values = [0.0, -0.0, 1e-4, 0.1, 1.0, 1e15, 9.999999999999998e15, 123.456]
+        values += [10 ** rng.uniform(-4, 16) * rng.choice((1, -1)) for _ in range(5000)]
+        
+        for value in values:
+            data = {"v": value, "s": "text", "n": None, "i": 12345, "l": [True, False]}
+            buf = _orjson_dumps(data, canonical=True)
+            assert buf is not None, value
+            assert buf == reference(data), value
+    
+    def test_tracker_record_with_epoch_log_uses_orjson(self):
+        record = tracker_record(training__epochs=None, training__batch_size=None)
+        record["epoch_log"] = {"energy_kwh": [0.01, None], "duration_seconds": [60, 61]}
+        
+        buf = _orjson_dumps(record, canonical=True)
+        assert buf is not None
+        assert buf == reference(record)
+    
+    @pytest.mark.parametrize("value", [
+        float("nan"),
+        float("inf"),
+        1e-5,
+        1e16,
+        Precision.FP16,
+        Framework.TORCH,
+        uuid.UUID(int=1),
+        type("Text", (str,), {})("subclass"),
+    ], ids=repr)
+    def test_refuses_values_it_would_encode_differently(self, value):
+        assert _orjson_dumps({"v": value}, canonical=True) is None
+        assert _orjson_dumps({"nested": [{"v": value}]}, canonical=True) is None
+    
+    def test_refuses_non_string_keys(self):
+        assert _orjson_dumps({1: "a"}, canonical=True) is None
+    
+    def test_indented_output_round_trips(self):
+        record = tracker_record(training__epochs=None)
+        record["epoch_log"] = {"energy_kwh": [1e-7, None], "duration_seconds": [60, 61]}
+        
+        buf = _orjson_dumps(record, indent=True)
+        assert buf is not None
+        assert json.loads(buf) == record
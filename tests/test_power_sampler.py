@@ -0,0 +1,141 @@
+"""
+Tests for NVML error handling in PowerSampler and MRVTracker.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mrv_wrapper import energy, tracker
+from mrv_wrapper.energy import PowerSampler
+
+
+class FakeNVML:
+    """Stand-in for pynvml with one GPU drawing a constant 100 W."""
+    
+    class NVMLError(Exception):
+        pass
+    
+    class NVMLError_NotSupported(NVMLError):
+        pass
+    
+    def __init__(self, fail_after=None):
+        # Number of successful power readings before NotSupported is raised
+        self.fail_after = fail_after
+        self.readings = 0
+        self.open = 0
+    
+    def nvmlInit(self):
+        self.open += 1
+    
+    def nvmlShutdown(self):
+        self.open -= 1
+    
+    def nvmlDeviceGetCount(self):
+        return 1
+    
+    def nvmlDeviceGetHandleByIndex(self, index):
+        return index
+    
+    def nvmlDeviceGetPowerUsage(self, handle):
+        if self.fail_after is not None and self.readings >= self.fail_after:
+            raise self.NVMLError_NotSupported("Not Supported")
+        self.readings += 1
+        return 100000  # milliwatts
+
+
+@pytest.fixture
+def fake_nvml(monkeypatch):
+    def install(fail_after=None):
+        nvml = FakeNVML(fail_after)
+        monkeypatch.setattr(energy, "pynvml", nvml, raising=False)
+        monkeypatch.setattr(energy, "NVML_AVAILABLE", True)
+        return nvml
+    return install
+
+
+def wait_for_readings(nvml, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while nvml.readings < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_is_supported_requires_power_readings(fake_nvml):
+    fake_nvml()
+    assert PowerSampler.is_supported()
+    
+    nvml = fake_nvml(fail_after=0)
+    assert not PowerSampler.is_supported()
+    assert nvml.open == 0
+
+
+def test_start_fails_cleanly_when_power_is_not_reported(fake_nvml):
+    nvml = fake_nvml(fail_after=0)
+    
+    assert PowerSampler().start() is False
+    assert nvml.open == 0
+
+
+def test_measures_energy_and_closes_nvml(fake_nvml):
+    nvml = fake_nvml()
+    sampler = PowerSampler(interval=0.01)
+    
+    assert sampler.start()
+    wait_for_readings(nvml, 5)
+    energy_kwh = sampler.stop()
+    
+    assert energy_kwh is not None and energy_kwh > 0
+    assert nvml.open == 0
+
+
+def test_error_during_run_returns_none_and_closes_nvml(fake_nvml):
+    nvml = fake_nvml(fail_after=3)
+    sampler = PowerSampler(interval=0.01)
+    
+    assert sampler.start()
+    wait_for_readings(nvml, 3)
+    time.sleep(0.05)
+    
+    assert sampler.stop() is None
+    assert nvml.open == 0
+
+
+@pytest.fixture
+def nvml_tracker(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracker, "CODECARBON_AVAILABLE", False)
+    monkeypatch.setattr(tracker, "estimate_tdp_watts", lambda: 3600.0)
+    return tracker.MRVTracker(
+        "nvml_test",
+        storage_dir=str(tmp_path),
+        blockchain_enabled=False,
+        energy_backend="nvml"
+    )
+
+
+def test_tracker_falls_back_to_tdp_when_sampling_fails(fake_nvml, nvml_tracker):
+    nvml = fake_nvml(fail_after=2)
+    
+    nvml_tracker.start()
+    assert nvml_tracker.measurement_tool == "NVML"
+    wait_for_readings(nvml, 2)
+    nvml_tracker.stop()
+    
+    record = nvml_tracker.get_mrv_data()
+    assert record["energy_emissions"]["measurement_tool"] == "estimated_tdp"
+    assert (nvml_tracker.storage.storage_dir / f"{nvml_tracker.mrv_id}.json").exists()
+    assert nvml.open == 0
+
+
+def test_tracker_falls_back_when_sampler_cannot_start(fake_nvml, nvml_tracker, monkeypatch):
+    nvml = fake_nvml()
+    monkeypatch.setattr(PowerSampler, "is_supported", staticmethod(lambda: True))
+    nvml.fail_after = 0
+    
+    nvml_tracker.start()
+    assert nvml_tracker.power_sampler is None
+    nvml_tracker.stop()
+    
+    assert nvml_tracker.get_mrv_data()["energy_emissions"]["measurement_tool"] == "estimated_tdp"
+    assert nvml.open == 0
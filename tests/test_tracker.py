@@ -0,0 +1,188 @@
+"""
+Tests for MRVTracker measurement bookkeeping.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from mrv_wrapper import tracker
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tracker.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def make_tracker(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracker, "CODECARBON_AVAILABLE", False)
+    monkeypatch.setattr(tracker, "estimate_tdp_watts", lambda: 3600.0)
+    
+    def make():
+        return tracker.MRVTracker(
+            "test_run",
+            storage_dir=str(tmp_path),
+            blockchain_enabled=False
+        )
+    return make
+
+
+@pytest.mark.parametrize("epochs, epoch_seconds", [(90, 1.9), (10, 0.3), (7, 61.75)])
+def test_epoch_durations_add_up_to_run_duration(clock, make_tracker, epochs, epoch_seconds):
+    run = make_tracker()
+    started = clock.now
+    run.start()
+    for _ in range(epochs):
+        clock.now += epoch_seconds
+        run.log_epoch()
+    run.stop()
+    
+    record = run.get_mrv_data()
+    logged = record["epoch_log"]["duration_seconds"]
+    assert len(logged) == epochs
+    assert sum(logged) == record["energy_emissions"]["duration_seconds"]
+    # Truncated only once, at the end of the run
+    assert sum(logged) == int(clock.now - started)
+
+
+def test_unmeasured_epoch_energy_is_null(clock, make_tracker):
+    run = make_tracker()
+    run.start()
+    clock.now += 2
+    run.log_epoch()
+    clock.now += 2
+    run.log_epoch(0.5)
+    run.stop()
+    
+    assert run.get_mrv_data()["epoch_log"]["energy_kwh"] == [None, 0.5]
+
+
+def test_log_epoch_before_start_raises(make_tracker):
+    with pytest.raises(RuntimeError):
+        make_tracker().log_epoch()
+
+
+class FakeEmissionsTracker:
+    """Stand-in for codecarbon.EmissionsTracker with scripted results."""
+    
+    instances = []
+    energy_consumed = 0.2  # kWh measured by CodeCarbon
+    emissions = 0.08  # kg CO₂
+    
+    def __init__(self, **kwargs):
+        self.started = False
+        FakeEmissionsTracker.instances.append(self)
+    
+    def start(self):
+        self.started = True
+    
+    def stop(self):
+        if self.energy_consumed is not None:
+            self.final_emissions_data = SimpleNamespace(
+                energy_consumed=self.energy_consumed,
+                emissions=self.emissions
+            )
+        # Like CodeCarbon, stop() returns kg CO₂, not kWh
+        return self.emissions
+
+
+@pytest.fixture
+def codecarbon(monkeypatch):
+    FakeEmissionsTracker.instances = []
+    monkeypatch.setattr(tracker, "CODECARBON_AVAILABLE", True)
+    monkeypatch.setattr(tracker, "EmissionsTracker", FakeEmissionsTracker, raising=False)
+    # Fired by hand unless a test lowers it
+    monkeypatch.setattr(tracker, "CODECARBON_START_DELAY", 3600.0)
+    return FakeEmissionsTracker
+
+
+def energy_of(run):
+    return run.get_mrv_data()["energy_emissions"]
+
+
+def test_codecarbon_energy_includes_window_before_start(clock, make_tracker, codecarbon):
+    run = make_tracker()
+    run.start()
+    assert run.measurement_tool == "estimated_tdp"
+    
+    # 3600 W for 5 s before CodeCarbon starts: 0.005 kWh
+    clock.now += 5
+    run._lazy_start_codecarbon()
+    assert codecarbon.instances[0].started
+    
+    clock.now += 100
+    run.stop()
+    
+    energy = energy_of(run)
+    assert energy["measurement_tool"] == "CodeCarbon"
+    assert energy["energy_kwh"] == pytest.approx(0.205)
+    # Measured carbon intensity (0.4 kg/kWh) applied to the whole run
+    assert energy["co2_kg"] == pytest.approx(0.082)
+    assert energy["duration_seconds"] == 105
+
+
+def test_codecarbon_without_final_data_reports_estimated_window(clock, make_tracker, codecarbon, monkeypatch):
+    monkeypatch.setattr(codecarbon, "energy_consumed", None)
+    run = make_tracker()
+    run.start()
+    clock.now += 5
+    run._lazy_start_codecarbon()
+    clock.now += 100
+    run.stop()
+    
+    energy = energy_of(run)
+    assert energy["energy_kwh"] == pytest.approx(0.005)
+    assert energy["co2_kg"] == 0.0
+
+
+def test_codecarbon_measuring_no_energy_reports_no_co2(clock, make_tracker, codecarbon, monkeypatch):
+    monkeypatch.setattr(codecarbon, "energy_consumed", 0.0)
+    run = make_tracker()
+    run.start()
+    clock.now += 5
+    run._lazy_start_codecarbon()
+    run.stop()
+    
+    energy = energy_of(run)
+    assert energy["energy_kwh"] == pytest.approx(0.005)
+    assert energy["co2_kg"] == 0.0
+
+
+def test_short_run_is_estimated_and_late_timer_is_ignored(clock, make_tracker, codecarbon):
+    run = make_tracker()
+    run.start()
+    clock.now += 2
+    run.stop()
+    
+    # The timer callback may still run after stop() took the lock
+    run._lazy_start_codecarbon()
+    
+    assert codecarbon.instances == []
+    energy = energy_of(run)
+    assert energy["measurement_tool"] == "estimated_tdp"
+    assert energy["energy_kwh"] == pytest.approx(0.002)
+    assert energy["co2_kg"] == 0.0
+
+
+def test_timer_starts_codecarbon(make_tracker, codecarbon, monkeypatch):
+    monkeypatch.setattr(tracker, "CODECARBON_START_DELAY", 0.01)
+    run = make_tracker()
+    run.start()
+    run._codecarbon_timer.join(timeout=2)
+    run.stop()
+    
+    assert len(codecarbon.instances) == 1
+    assert energy_of(run)["measurement_tool"] == "CodeCarbon"
@@ -0,0 +1,84 @@
+"""
+Tests for nonce selection in BlockchainConnector._send_transaction.
+"""
+
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("web3")
+
+from hexbytes import HexBytes
+
+from mrv_wrapper.blockchain import BlockchainConnector
+
+
+class FakeEth:
+    """Node that mines nothing: sent transactions stay pending."""
+    
+    chain_id = 31337
+    gas_price = 1
+    
+    def __init__(self):
+        self.mined = 5
+        self.pending = []
+        self.fail_next_send = False
+    
+    def get_transaction_count(self, address, block='latest'):
+        if block == 'pending':
+            return self.mined + len(self.pending)
+        return self.mined
+    
+    def send_raw_transaction(self, raw):
+        if self.fail_next_send:
+            self.fail_next_send = False
+            raise ValueError("connection reset")
+        self.pending.append(raw)
+        return HexBytes(bytes([len(self.pending)]) * 32)
+
+
+@pytest.fixture
+def connector():
+    connector = BlockchainConnector(
+        rpc_url="http://127.0.0.1:1",
+        contract_address="0x" + "22" * 20,
+        private_key="0x" + "11" * 32
+    )
+    eth = FakeEth()
+    connector.w3 = mock.Mock(eth=eth, is_connected=lambda: True)
+    
+    nonces = []
+    sign = connector.account.sign_transaction
+    connector.account = mock.Mock(
+        address=connector.account.address,
+        sign_transaction=lambda tx: (nonces.append(tx['nonce']), sign(tx))[1]
+    )
+    connector.nonces = nonces
+    return connector
+
+
+def test_unmined_transactions_get_consecutive_nonces(connector):
+    for i in range(3):
+        assert connector.submit_hash(f"MRV-{i}", "00" * 32) is not None
+    
+    assert connector.nonces == [5, 6, 7]
+
+
+def test_failed_send_does_not_leave_a_nonce_gap(connector):
+    connector.submit_hash("MRV-0", "00" * 32)
+    connector.w3.eth.fail_next_send = True
+    assert connector.submit_hash("MRV-1", "00" * 32) is None
+    connector.submit_hash("MRV-2", "00" * 32)
+    
+    assert connector.nonces == [5, 6, 6]
+
+
+def test_dropped_transaction_does_not_leave_a_nonce_gap(connector):
+    connector.submit_hash("MRV-0", "00" * 32)
+    connector.submit_hash("MRV-1", "00" * 32)
+    
+    # The node restarts and forgets both pending transactions
+    connector.w3.eth.pending.clear()
+    connector.submit_hash("MRV-2", "00" * 32)
+    
+    assert connector.nonces == [5, 6, 5]
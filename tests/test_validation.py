@@ -0,0 +1,119 @@
+"""
+Tests for MRV record validation against schema.json.
+"""
+
+import copy
+
+import pytest
+
+from mrv_wrapper import tracker, utils
+from mrv_wrapper.utils import validate_mrv_batch, validate_mrv_json
+
+
+@pytest.fixture(scope="module")
+def record(tmp_path_factory):
+    """A record produced by MRVTracker, with default (null) training fields."""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(tracker, "CODECARBON_AVAILABLE", False)
+    monkeypatch.setattr(tracker, "estimate_tdp_watts", lambda: 100.0)
+    try:
+        run = tracker.MRVTracker(
+            "validation",
+            storage_dir=str(tmp_path_factory.mktemp("mrv")),
+            blockchain_enabled=False
+        )
+        run.start()
+        run.stop()
+    finally:
+        monkeypatch.undo()
+    return run.get_mrv_data()
+
+
+@pytest.fixture(params=[True, False], ids=["fastjsonschema", "fallback"])
+def schema_backend(request, monkeypatch):
+    """Run a test with the compiled schema and with the required-key fallback."""
+    if request.param and not utils.FASTJSONSCHEMA_AVAILABLE:
+        pytest.skip("fastjsonschema not installed")
+    monkeypatch.setattr(utils, "FASTJSONSCHEMA_AVAILABLE", request.param)
+    return request.param
+
+
+def without(record, *path):
+    """Copy of record with the key at path removed."""
+    broken = copy.deepcopy(record)
+    parent = broken
+    for key in path[:-1]:
+        parent = parent[key]
+    del parent[path[-1]]
+    return broken
+
+
+def with_value(record, value, *path):
+    """Copy of record with the key at path set to value."""
+    changed = copy.deepcopy(record)
+    parent = changed
+    for key in path[:-1]:
+        parent = parent[key]
+    parent[path[-1]] = value
+    return changed
+
+
+def test_tracker_record_is_valid(record, schema_backend):
+    assert record["training"]["epochs"] is None
+    assert validate_mrv_json(record)
+
+
+def test_tracker_record_with_epoch_log_is_valid(record, schema_backend):
+    logged = copy.deepcopy(record)
+    logged["epoch_log"] = {"energy_kwh": [None, 0.25, None], "duration_seconds": [60, 61, 59]}
+    
+    assert validate_mrv_json(logged)
+
+
+@pytest.mark.parametrize("path", [
+    ("schema_version",),
+    ("mrv_id",),
+    ("experiment",),
+    ("training",),
+    ("hardware",),
+    ("energy_emissions",),
+    ("timestamps",),
+    ("experiment", "experiment_name"),
+    ("energy_emissions", "energy_kwh"),
+    ("timestamps", "start_time"),
+], ids="/".join)
+def test_missing_required_key_is_invalid(record, schema_backend, path):
+    assert not validate_mrv_json(without(record, *path))
+
+
+@pytest.mark.parametrize("value, path", [
+    ("0.1", ("energy_emissions", "energy_kwh")),
+    (None, ("energy_emissions", "energy_kwh")),
+    ("ten", ("training", "epochs")),
+    (1.5, ("training", "batch_size")),
+    ("2", ("hardware", "num_gpus")),
+    (42, ("experiment", "experiment_name")),
+    ("config", ("experiment",)),
+    ([0.1, "high"], ("epoch_log", "energy_kwh")),
+    ([60.5], ("epoch_log", "duration_seconds")),
+], ids=repr)
+def test_wrong_type_is_invalid(record, value, path):
+    if not utils.FASTJSONSCHEMA_AVAILABLE:
+        pytest.skip("types are only checked by the compiled schema")
+    if path[0] == "epoch_log":
+        record = with_value(record, {"energy_kwh": [], "duration_seconds": []}, "epoch_log")
+    
+    assert not validate_mrv_json(with_value(record, value, *path))
+
+
+def test_batch_matches_single_validation(record, schema_backend):
+    records = [
+        record,
+        without(record, "mrv_id"),
+        without(record, "timestamps", "start_time"),
+        record
+    ]
+    
+    assert validate_mrv_batch(records) == [validate_mrv_json(r) for r in records]
+    assert validate_mrv_batch(records) == [True, False, False, True]
+    assert validate_mrv_batch([]) == []